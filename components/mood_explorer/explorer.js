@@ -0,0 +1,472 @@
+// Client-side mood explorer.
+//
+// Receives the month aggregates built by mood_explorer.build_month_aggregates
+// as render args, then filters and charts them in the browser: changing a
+// control here never triggers a Streamlit rerun. Speaks the components v1
+// postMessage protocol directly (no build step).
+//
+// The payload arrives once per session and dataset version; later renders
+// carry only args.version and reuse the decoded copy (or the raw one kept in
+// sessionStorage, for a remounted frame). A frame with neither asks the
+// server for it through the component value.
+
+const SCHEMA = 1;
+const MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"];
+const BAND_COLORS = ["rgba(255,0,0,0.07)", "rgba(255,215,0,0.08)", "rgba(0,128,0,0.07)"];
+const BLUES_R = ["#08306b", "#08519c", "#2171b5", "#4292c6", "#6baed6", "#9ecae1", "#c6dbef", "#deebf7", "#f7fbff"];
+const PLOT_CONFIG = { responsive: true, displaylogo: false };
+
+let data = null;     // decoded payload
+let view = null;     // "overview" | "monthly" | "emotions"
+let options = {};
+let theme = {};
+const ui = {};       // control state, kept across re-renders of the same dataset version
+let requested = null; // version last asked for, so a frame asks at most once
+const STORAGE_KEY = "mood_explorer:payload";
+
+// -----------------------------
+// Streamlit protocol
+// -----------------------------
+function send(type, extra) {
+  window.parent.postMessage(Object.assign({ isStreamlitMessage: true, type: type }, extra), "*");
+}
+
+function setFrameHeight() {
+  send("streamlit:setFrameHeight", { height: document.documentElement.scrollHeight });
+}
+
+function requestPayload(version) {
+  // Changing the component value triggers one rerun, in which the server resends the payload
+  requested = version;
+  send("streamlit:setComponentValue", {
+    value: { need: version, id: Date.now() + ":" + Math.random() },
+    dataType: "json",
+  });
+}
+
+window.addEventListener("message", function (event) {
+  if (event.data && event.data.type === "streamlit:render") {
+    onRender(event.data.args, event.data.theme || {});
+  }
+});
+
+window.addEventListener("resize", setFrameHeight);
+
+// -----------------------------
+// Payload
+// -----------------------------
+function decode(p) {
+  const E = p.emotions.length;
+  const rows = p.months.map(function (key, i) {
+    return {
+      key: key,
+      year: Math.floor(key / 12),
+      month: (key % 12) + 1,
+      days: p.days.slice(i * E, (i + 1) * E),
+      scoreSum: p.score_sum.slice(i * E, (i + 1) * E),
+      scored: p.scored[i],
+      hi: p.hi[i],
+    };
+  });
+  const years = Array.from(new Set(rows.map(function (r) { return r.year; })));
+  return Object.assign({}, p, { E: E, rows: rows, years: years });
+}
+
+function remember(p) {
+  try {
+    sessionStorage.setItem(STORAGE_KEY, JSON.stringify(p));
+  } catch (e) {
+    // Storage unavailable: a remounted frame asks the server again
+  }
+}
+
+function recall(version) {
+  try {
+    const p = JSON.parse(sessionStorage.getItem(STORAGE_KEY));
+    return p && p.version === version && p.schema === SCHEMA ? p : null;
+  } catch (e) {
+    return null;
+  }
+}
+
+function sum(values) {
+  return values.reduce(function (a, b) { return a + b; }, 0);
+}
+
+function columnSums(rows, field, n) {
+  const out = new Array(n).fill(0);
+  rows.forEach(function (r) { r[field].forEach(function (v, j) { out[j] += v; }); });
+  return out;
+}
+
+function roundHalfEven(x) {
+  // Python's round(), so the rounded score matches the server-side pages
+  const r = Math.round(x);
+  return Math.abs(x % 1) === 0.5 && r % 2 !== 0 ? r - 1 : r;
+}
+
+function argBest(rows, better) {
+  let best = null;
+  rows.forEach(function (r) { if (best === null || better(r.hi, best.hi)) best = r; });
+  return best;
+}
+
+function rolling3(values) {
+  return values.map(function (_, i) {
+    const win = values.slice(Math.max(0, i - 2), i + 1);
+    return sum(win) / win.length;
+  });
+}
+
+function isoMonth(r) {
+  return r.year + "-" + String(r.month).padStart(2, "0") + "-01";
+}
+
+// -----------------------------
+// Rendering helpers
+// -----------------------------
+function el(tag, attrs, children) {
+  const node = document.createElement(tag);
+  Object.entries(attrs || {}).forEach(function (kv) {
+    if (kv[0] === "text") node.textContent = kv[1];
+    else node.setAttribute(kv[0], kv[1]);
+  });
+  (children || []).forEach(function (c) { node.appendChild(c); });
+  return node;
+}
+
+function selectControl(label, values, selected, format, onChange) {
+  const select = el("select", { "aria-label": label });
+  values.forEach(function (v) {
+    const opt = el("option", { value: String(v), text: format ? format(v) : String(v) });
+    if (String(v) === String(selected)) opt.selected = true;
+    select.appendChild(opt);
+  });
+  select.addEventListener("change", function () { onChange(select.value); });
+  return el("label", {}, [el("span", { text: label }), select]);
+}
+
+function checkboxControl(label, checked, onChange) {
+  const box = el("input", { type: "checkbox" });
+  box.checked = checked;
+  box.addEventListener("change", function () { onChange(box.checked); });
+  return el("label", { class: "inline" }, [box, el("span", { text: label })]);
+}
+
+function kpi(label, value, sub, help) {
+  const node = el("div", { class: "kpi" }, [
+    el("div", { class: "label", text: label }),
+    el("div", { class: "value", text: value }),
+  ]);
+  if (sub) node.appendChild(el("div", { class: "sub", text: sub }));
+  if (help) node.setAttribute("title", help);
+  return node;
+}
+
+function layout(title, extra) {
+  const grid = "rgba(250,250,250,0.1)";
+  return Object.assign({
+    title: { text: title },
+    paper_bgcolor: "rgba(0,0,0,0)",
+    plot_bgcolor: "rgba(0,0,0,0)",
+    font: { color: theme.textColor || "#fafafa", family: theme.font || "sans-serif" },
+    margin: { l: 50, r: 10, t: 50, b: 40 },
+    xaxis: { gridcolor: grid, zeroline: false },
+    yaxis: { gridcolor: grid, zeroline: false },
+    legend: { orientation: "h", y: -0.15 },
+  }, extra);
+}
+
+function bandShapes(yMin, yMax, cutoffs) {
+  // Same clamping as mood_data.add_hi_bands
+  if (!cutoffs) return [];
+  const clamp = function (v) { return Math.max(yMin, Math.min(v, yMax)); };
+  const edges = [yMin, clamp(cutoffs[0]), clamp(cutoffs[1]), yMax];
+  const shapes = [];
+  for (let i = 0; i < 3; i++) {
+    if (edges[i + 1] > edges[i]) {
+      shapes.push({
+        type: "rect", xref: "paper", x0: 0, x1: 1, yref: "y", y0: edges[i], y1: edges[i + 1],
+        fillcolor: BAND_COLORS[i], line: { width: 0 }, layer: "below",
+      });
+    }
+  }
+  return shapes;
+}
+
+function plot(id, traces, lay) {
+  Plotly.react(document.getElementById(id), traces, lay, PLOT_CONFIG);
+}
+
+function message(text) {
+  return el("div", { class: "kpi" }, [el("div", { class: "sub", text: text })]);
+}
+
+// -----------------------------
+// Views
+// -----------------------------
+const VIEWS = {};
+
+VIEWS.overview = {
+  init: function () {
+    if (!data.years.includes(ui.year)) ui.year = options.year || data.years[data.years.length - 1];
+    return [selectControl("Year", data.years, ui.year, null, function (v) {
+      ui.year = Number(v);
+      draw();
+    })];
+  },
+  draw: function (out) {
+    const rows = data.rows.filter(function (r) { return r.year === ui.year; });
+    const days = columnSums(rows, "days", data.E);
+    const totalDays = sum(days);
+    const scored = sum(rows.map(function (r) { return r.scored; }));
+    const avg = scored ? sum(columnSums(rows, "scoreSum", data.E)) / scored : null;
+    const rounded = avg === null ? null : roundHalfEven(avg);
+
+    const emotionFor = function (counts) {
+      let best = -1;
+      data.emotions.forEach(function (_, j) {
+        if (data.scores[j] === rounded && counts[j] > 0 && (best < 0 || counts[j] > counts[best])) best = j;
+      });
+      return best < 0 ? null : data.emotions[best];
+    };
+    const avgEmotion = rounded === null ? "N/A"
+      : emotionFor(days) || emotionFor(columnSums(data.rows, "days", data.E)) || "N/A";
+
+    const withHi = rows.filter(function (r) { return r.hi !== null; });
+    const best = argBest(withHi, function (a, b) { return a > b; });
+    const worst = argBest(withHi, function (a, b) { return a < b; });
+
+    out.appendChild(el("div", { class: "kpis" }, [
+      kpi("Days logged", String(totalDays)),
+      kpi("Avg daily emotion", avgEmotion, null, rounded === null ? null : "Rounded score: " + rounded),
+      kpi("Best month", best ? MONTH_NAMES[best.month - 1] : "N/A"),
+      kpi("Worst month", worst ? MONTH_NAMES[worst.month - 1] : "N/A"),
+    ]));
+    out.appendChild(el("hr"));
+    out.appendChild(el("div", { id: "hi" }));
+    out.appendChild(el("hr"));
+    out.appendChild(el("div", { class: "row" }, [el("div", { id: "bar" }), el("div", { id: "pie" })]));
+
+    const his = withHi.map(function (r) { return r.hi; });
+    let yMin = 0, yMax = (data.hi_cutoffs ? data.hi_cutoffs[1] : 0) + 10;
+    if (his.length) {
+      const lo = Math.min.apply(null, his), hi = Math.max.apply(null, his);
+      const margin = Math.max(10, 0.15 * (hi - lo));
+      yMin = Math.max(0, lo - margin);
+      yMax = hi + margin;
+    }
+    plot("hi", [{
+      x: withHi.map(function (r) { return r.month; }), y: his, mode: "lines+markers", name: "HI",
+      hovertemplate: "month=%{x}<br>happiness_index=%{y}<extra></extra>",
+    }], layout("Monthly Happiness Index — " + ui.year, {
+      height: 450,
+      showlegend: false,
+      xaxis: { dtick: 1, title: { text: "month" }, gridcolor: "rgba(250,250,250,0.1)" },
+      yaxis: { range: [yMin, yMax], title: { text: "happiness_index" }, gridcolor: "rgba(250,250,250,0.1)" },
+      shapes: bandShapes(yMin, yMax, data.hi_cutoffs),
+    }));
+
+    const present = data.emotions.map(function (_, j) { return j; }).filter(function (j) { return days[j] > 0; });
+    const byDays = present.slice().sort(function (a, b) { return days[b] - days[a]; });
+    plot("bar", [{
+      type: "bar",
+      x: byDays.map(function (j) { return data.emotions[j]; }),
+      y: byDays.map(function (j) { return days[j]; }),
+      marker: { color: byDays.map(function (j) { return data.colors[j]; }) },
+      hovertemplate: "%{x}: %{y} days<extra></extra>",
+    }], layout("Days by Emotion", { height: 450, showlegend: false, xaxis: { showticklabels: false } }));
+
+    const ordered = data.legend.map(function (e) { return data.emotions.indexOf(e); })
+      .filter(function (j) { return j >= 0 && days[j] > 0; });
+    plot("pie", [{
+      type: "pie", sort: false, direction: "clockwise",
+      labels: ordered.map(function (j) { return data.emotions[j]; }),
+      values: ordered.map(function (j) { return days[j]; }),
+      marker: { colors: ordered.map(function (j) { return data.colors[j]; }) },
+    }], layout("Emotion Share (Days)", { height: 450 }));
+  },
+};
+
+VIEWS.monthly = {
+  init: function () {
+    const years = data.rows.filter(function (r) { return r.hi !== null; }).map(function (r) { return r.year; });
+    if (!years.length) return [];
+    const lo = Math.min.apply(null, years), hi = Math.max.apply(null, years);
+    ui.years = Array.from(new Set(years));
+    if (!ui.years.includes(ui.yearMin)) ui.yearMin = lo;
+    if (!ui.years.includes(ui.yearMax)) ui.yearMax = hi;
+    if (ui.rolling === undefined) ui.rolling = options.rolling !== false;
+    return [
+      selectControl("From", ui.years, ui.yearMin, null, function (v) {
+        ui.yearMin = Number(v);
+        if (ui.yearMax < ui.yearMin) ui.yearMax = ui.yearMin;
+        render();
+      }),
+      selectControl("To", ui.years, ui.yearMax, null, function (v) {
+        ui.yearMax = Number(v);
+        if (ui.yearMin > ui.yearMax) ui.yearMin = ui.yearMax;
+        render();
+      }),
+      checkboxControl("Show 3-month rolling average", ui.rolling, function (v) {
+        ui.rolling = v;
+        draw();
+      }),
+    ];
+  },
+  draw: function (out) {
+    const rows = data.rows.filter(function (r) {
+      return r.hi !== null && r.year >= ui.yearMin && r.year <= ui.yearMax;
+    });
+    if (!rows.length) {
+      out.appendChild(message("No happiness index data available for the selected range."));
+      return;
+    }
+    const his = rows.map(function (r) { return r.hi; });
+    const x = rows.map(isoMonth);
+    const yMin = Math.min.apply(null, his), yMax = Math.max.apply(null, his);
+    const best = argBest(rows, function (a, b) { return a > b; });
+    const worst = argBest(rows, function (a, b) { return a < b; });
+    const label = function (r) { return MONTH_NAMES[r.month - 1] + " " + r.year; };
+
+    out.appendChild(el("h4", { text: "Happiness Index over time" }));
+    out.appendChild(el("div", { id: "trend" }));
+    out.appendChild(el("hr"));
+    out.appendChild(el("div", { class: "kpis" }, [
+      kpi("Avg HI (selected range)", (Math.round(10 * sum(his) / his.length) / 10).toString()),
+      kpi("Best month", label(best), "HI " + best.hi),
+      kpi("Worst month", label(worst), "HI " + worst.hi),
+    ]));
+
+    const traces = [{
+      x: x, y: his, mode: "lines+markers", name: "HI",
+      hovertemplate: "%{x|%b %Y}<br>HI: %{y}<extra></extra>",
+    }];
+    if (ui.rolling) {
+      traces.push({
+        x: x, y: rolling3(his), mode: "lines", name: "Rolling (3-mo)", line: { dash: "dash" },
+        hovertemplate: "%{x|%b %Y}<br>3-mo avg: %{y:.1f}<extra></extra>",
+      });
+    }
+    plot("trend", traces, layout("", {
+      height: 420,
+      margin: { l: 50, r: 10, t: 20, b: 40 },
+      yaxis: { title: { text: "Happiness Index" }, gridcolor: "rgba(250,250,250,0.1)" },
+      shapes: bandShapes(yMin, yMax, data.hi_cutoffs),
+    }));
+  },
+};
+
+VIEWS.emotions = {
+  init: function () {
+    if (!data.emotions.includes(ui.emotion)) {
+      ui.emotion = data.emotions.includes(options.emotion) ? options.emotion
+        : data.emotions.includes("Happy") ? "Happy" : data.emotions[0];
+    }
+    return [selectControl("Emotion", data.emotions, ui.emotion, null, function (v) {
+      ui.emotion = v;
+      draw();
+    })];
+  },
+  draw: function (out) {
+    const j = data.emotions.indexOf(ui.emotion);
+    const rows = data.rows.filter(function (r) { return r.days[j] > 0; });
+    const days = rows.map(function (r) { return r.days[j]; });
+
+    out.appendChild(el("div", { id: "trend" }));
+    out.appendChild(el("hr"));
+    out.appendChild(el("h4", { text: "Seasonality (emotion × month)" }));
+    out.appendChild(el("div", { id: "heat" }));
+    out.appendChild(el("hr"));
+    out.appendChild(el("h4", { text: "Yearly volatility" }));
+    out.appendChild(el("div", { id: "vol" }));
+
+    const x = rows.map(isoMonth);
+    plot("trend", [
+      { x: x, y: days, mode: "lines+markers", name: ui.emotion, hovertemplate: "%{x|%b %Y}<br>%{y} days<extra></extra>" },
+      { x: x, y: rolling3(days), mode: "lines", name: "3-month avg", line: { dash: "dash" } },
+    ], layout(ui.emotion + " — Days over time", {
+      height: 420,
+      legend: { x: 0.98, y: 0.98, xanchor: "right", yanchor: "top" },
+      xaxis: { range: options.x_range || null, gridcolor: "rgba(250,250,250,0.1)" },
+    }));
+
+    const years = Array.from(new Set(rows.map(function (r) { return r.year; })));
+    const z = years.map(function () { return new Array(12).fill(null); });
+    rows.forEach(function (r) { z[years.indexOf(r.year)][r.month - 1] = r.days[j]; });
+    plot("heat", [{
+      type: "heatmap", z: z, x: MONTH_NAMES, y: years.map(String),
+      colorscale: BLUES_R.map(function (c, i) { return [i / (BLUES_R.length - 1), c]; }),
+      hovertemplate: "%{x} %{y}: %{z} days<extra></extra>",
+    }], layout(ui.emotion + " — days per month", {
+      height: 520,
+      yaxis: { autorange: "reversed", type: "category" },
+    }));
+
+    const std = years.map(function (y) {
+      const v = rows.filter(function (r) { return r.year === y; }).map(function (r) { return r.days[j]; });
+      if (v.length < 2) return null;
+      const mean = sum(v) / v.length;
+      return Math.sqrt(sum(v.map(function (d) { return (d - mean) * (d - mean); })) / (v.length - 1));
+    });
+    plot("vol", [{ type: "bar", x: years, y: std, hovertemplate: "%{x}: %{y:.2f}<extra></extra>" }],
+      layout(ui.emotion + " — volatility (std dev of monthly days)", {
+        height: 360,
+        xaxis: { dtick: 1, gridcolor: "rgba(250,250,250,0.1)" },
+        yaxis: { title: { text: "Std dev" }, gridcolor: "rgba(250,250,250,0.1)" },
+      }));
+  },
+};
+
+// -----------------------------
+// Driver
+// -----------------------------
+function draw() {
+  const out = document.getElementById("charts");
+  out.replaceChildren();
+  VIEWS[view].draw(out);
+  setFrameHeight();
+}
+
+function render() {
+  const root = document.getElementById("root");
+  root.replaceChildren(
+    el("div", { class: "controls" }, VIEWS[view].init()),
+    el("div", { id: "charts" })
+  );
+  draw();
+}
+
+function onRender(args, newTheme) {
+  const version = args.version;
+  theme = newTheme;
+  document.body.style.setProperty("--text", theme.textColor || "#fafafa");
+  document.body.style.setProperty("--secondary-bg", theme.secondaryBackgroundColor || "#262730");
+
+  const have = data !== null && data.version === version;
+  let p = args.payload || null;
+  if (p) remember(p);
+  else if (!have) p = recall(version);
+
+  if (!p && !have) {
+    if (requested !== version) requestPayload(version);
+    document.getElementById("root").replaceChildren(message("Loading explorer data..."));
+    setFrameHeight();
+    return;
+  }
+  if (p && p.schema !== SCHEMA) {
+    document.getElementById("root").replaceChildren(message("Unsupported explorer payload; reload the page."));
+    setFrameHeight();
+    return;
+  }
+  const sameArgs = have && view === args.view
+    && JSON.stringify(options) === JSON.stringify(args.options || {});
+  if (sameArgs) return;  // rerun caused by another widget: keep the current charts
+
+  if (!have) data = decode(p);
+  view = args.view;
+  options = args.options || {};
+  render();
+}
+
+send("streamlit:componentReady", { apiVersion: 1 });
@@ -0,0 +1,456 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DAILY_CSV = "data/mood_all_years.csv"
+MONTHLY_CSV = "data/mood_monthly_hi.csv"
+HI_SKETCH_CSV = "data/mood_hi_sketch.csv"
+
+# Set by scripts/serve_workers.py: every worker attaches to this file
+SHARED_DATA_PATH = os.environ.get("MOOD_SHARED_DATA")
+
+# Emotion legend (label - score - sheet color), as extracted from the sheets
+EMOTIONS = [
+    ("Happy", 11, "#FFD966"),
+    ("Productive", 10, "#38761D"),
+    ("Good", 9, "#93C47D"),
+    ("Tired", 8, "#9FC5E8"),
+    ("Lazy", 7, "#EAD1DC"),
+    ("SAD", 6, "#B7B7B7"),
+    ("Stress/Anxiety", 5, "#D1802C"),
+    ("Angry/Annoyed", 4, "#CC0000"),
+    ("Depressed", 3, "#1155CC"),
+    ("Hopeless", 2, "#674EA7"),
+    ("Suicidal", 1, "#000000"),
+]
+
+# Column order of data/mood_all_years.csv
+DAILY_COLUMNS = [
+    "date", "year", "month", "day", "sheet", "emotion",
+    "score", "color_hex", "palette_match", "match_dist",
+]
+
+
+# -----------------------------
+# Prefix sums over day ordinals
+# -----------------------------
+def build_prefix_sums(df):
+    """
+    Cumulative per-emotion day counts and score sums indexed by day ordinal.
+
+    Row i of each array holds the totals for every day strictly before
+    ``first + i`` (``first`` = ordinal of the earliest logged date), so the
+    totals for any inclusive window are the difference of two rows.
+    Days with no entry simply contribute nothing.
+    """
+    legend = (
+        df[["emotion", "score", "color_hex"]]
+        .dropna(subset=["emotion"])
+        .drop_duplicates(subset="emotion", keep="first")
+        .sort_values("score", ascending=False)
+        .reset_index(drop=True)
+    )
+    emotions = legend["emotion"].tolist()
+
+    ordinals = np.array([d.toordinal() for d in df["date"].dt.date], dtype=np.int64)
+    first = int(ordinals.min())
+    last = int(ordinals.max())
+    n_days = last - first + 1
+
+    emo_idx = pd.Categorical(df["emotion"], categories=emotions).codes
+    valid = emo_idx >= 0
+    day_idx = ordinals[valid] - first
+    scores = pd.to_numeric(df["score"], errors="coerce").to_numpy(dtype=float)[valid]
+    has_score = ~np.isnan(scores)
+
+    days = np.zeros((n_days + 1, len(emotions)), dtype=np.int64)
+    score_sum = np.zeros((n_days + 1, len(emotions)), dtype=np.float64)
+    scored = np.zeros(n_days + 1, dtype=np.int64)
+
+    # Bucket by day (shifted by one), then accumulate
+    np.add.at(days, (day_idx + 1, emo_idx[valid]), 1)
+    np.add.at(score_sum, (day_idx + 1, emo_idx[valid]), np.where(has_score, scores, 0.0))
+    np.add.at(scored, day_idx + 1, has_score.astype(np.int64))
+
+    return {
+        "first": first,
+        "last": last,
+        "emotions": emotions,
+        "scores": legend["score"].tolist(),
+        "colors": legend["color_hex"].tolist(),
+        "days": days.cumsum(axis=0),
+        "score_sum": score_sum.cumsum(axis=0),
+        "scored": scored.cumsum(),
+    }
+
+
+def prefix_bounds(prefix):
+    """Return (first_date, last_date) covered by the prefix arrays."""
+    return (
+        pd.Timestamp.fromordinal(prefix["first"]).date(),
+        pd.Timestamp.fromordinal(prefix["last"]).date(),
+    )
+
+
+def _window(prefix, start, end):
+    """Map an inclusive [start, end] date window onto prefix row indices."""
+    n = len(prefix["scored"]) - 1
+    lo = min(max(start.toordinal() - prefix["first"], 0), n)
+    hi = min(max(end.toordinal() - prefix["first"] + 1, 0), n)
+    return lo, max(lo, hi)
+
+
+def range_summary(prefix, start, end):
+    """
+    Per-emotion totals for the inclusive date window [start, end].
+    Returns DataFrame with: emotion, score, color_hex, days, total
+    """
+    lo, hi = _window(prefix, start, end)
+    return pd.DataFrame({
+        "emotion": prefix["emotions"],
+        "score": prefix["scores"],
+        "color_hex": prefix["colors"],
+        "days": prefix["days"][hi] - prefix["days"][lo],
+        "total": prefix["score_sum"][hi] - prefix["score_sum"][lo],
+    })
+
+
+def range_avg_score(prefix, start, end):
+    """Average daily score over [start, end], or None if nothing was logged."""
+    lo, hi = _window(prefix, start, end)
+    n = int(prefix["scored"][hi] - prefix["scored"][lo])
+    if n == 0:
+        return None
+    total = float((prefix["score_sum"][hi] - prefix["score_sum"][lo]).sum())
+    return total / n
+
+
+# -----------------------------
+# Sorted (year, month) partition index
+# -----------------------------
+def sort_by_period(df):
+    """Order rows by date (daily) or year, month (monthly); no-op if already sorted."""
+    cols = ["date"] if "date" in df.columns else ["year", "month"]
+    keys = df[cols[0]] if cols == ["date"] else df["year"] * 12 + df["month"]
+    if keys.is_monotonic_increasing:
+        return df
+    return df.sort_values(cols, kind="stable").reset_index(drop=True)
+
+
+def build_partition_index(df):
+    """
+    Row offsets of every (year, month) run in a frame sorted by sort_by_period.
+    keys[i] = year * 12 + month - 1 and its rows are offsets[i]:offsets[i + 1].
+    """
+    ym = df["year"].to_numpy(dtype=np.int64) * 12 + df["month"].to_numpy(dtype=np.int64) - 1
+    if len(ym) and (np.diff(ym) < 0).any():
+        raise ValueError("frame must be sorted by year, month (see sort_by_period)")
+    keys, starts = np.unique(ym, return_index=True)
+    return {"keys": keys, "offsets": np.append(starts, len(ym))}
+
+
+def period_slice(df, index, start, end):
+    """
+    Rows for the months start..end inclusive, given as (year, month) tuples.
+    Binary search over the index; returns a view, so .copy() before mutating.
+    """
+    lo = np.searchsorted(index["keys"], start[0] * 12 + start[1] - 1, side="left")
+    hi = np.searchsorted(index["keys"], end[0] * 12 + end[1] - 1, side="right")
+    return df.iloc[index["offsets"][lo]:index["offsets"][hi]]
+
+
+def year_slice(df, index, year):
+    return period_slice(df, index, (year, 1), (year, 12))
+
+
+def month_slice(df, index, year, month):
+    return period_slice(df, index, (year, month), (year, month))
+
+
+def date_slice(df, start, end):
+    """Rows of a date-sorted frame with start <= date <= end (a view)."""
+    dates = df["date"].to_numpy()
+    lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left")
+    hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side="right")
+    return df.iloc[lo:hi]
+
+
+# -----------------------------
+# HI band thresholds (mergeable quantile sketch)
+# -----------------------------
+# HI is a month's score total, so it is an integer in 0..HI_MAX. A count per
+# value is an exact quantile sketch: adding months or merging datasets is
+# element-wise addition, and a quantile is one cumulative-sum lookup.
+HI_MAX = 31 * max(score for _, score, _ in EMOTIONS)
+
+HI_BAND_COLORS = ["rgba(255,0,0,0.07)", "rgba(255,215,0,0.08)", "rgba(0,128,0,0.07)"]
+
+
+def build_hi_sketch(values):
+    """Count of months per HI value (int64 array of length HI_MAX + 1)."""
+    v = pd.to_numeric(pd.Series(values), errors="coerce").dropna().round()
+    v = np.clip(v.to_numpy(dtype=np.int64), 0, HI_MAX)
+    return np.bincount(v, minlength=HI_MAX + 1).astype(np.int64)
+
+
+def merge_hi_sketches(*sketches):
+    """Sketch of the union of the sketched months (per-dataset or per-tenant)."""
+    return np.sum(sketches, axis=0, dtype=np.int64)
+
+
+def sketch_counts(sketch):
+    """Sparse form of a sketch: (happiness_index, months) for every non-empty bin."""
+    hi = np.flatnonzero(sketch)
+    return pd.DataFrame({"happiness_index": hi, "months": sketch[hi]})
+
+
+def sketch_from_counts(counts):
+    """Inverse of sketch_counts."""
+    sketch = np.zeros(HI_MAX + 1, dtype=np.int64)
+    np.add.at(sketch, counts["happiness_index"].to_numpy(dtype=np.int64), counts["months"].to_numpy(dtype=np.int64))
+    return sketch
+
+
+def read_hi_sketch():
+    """
+    Dataset sketch merged from the per-year sketches that scripts/build_tables.py
+    keeps in HI_SKETCH_CSV (it re-sketches only the years that changed).
+    None if that table has not been built.
+    """
+    if not os.path.exists(HI_SKETCH_CSV):
+        return None
+    counts = pd.read_csv(HI_SKETCH_CSV)
+    return merge_hi_sketches(
+        np.zeros(HI_MAX + 1, dtype=np.int64),
+        *(sketch_from_counts(year) for _, year in counts.groupby("year")),
+    )
+
+
+def sketch_value_at(sketch, rank):
+    """The rank-th smallest sketched HI (0-based)."""
+    return int(np.searchsorted(np.cumsum(sketch), rank, side="right"))
+
+
+def hi_band_cutoffs(sketch):
+    """
+    (low, high) tercile cutoffs: the last HI of the bottom and middle thirds,
+    split like np.array_split(sorted_hi, 3). None if nothing is sketched.
+    """
+    n = int(sketch.sum())
+    if n == 0:
+        return None
+    k, r = divmod(n, 3)
+    first = k + (r > 0)
+    second = first + k + (r > 1)
+    return sketch_value_at(sketch, first - 1), sketch_value_at(sketch, second - 1)
+
+
+def add_hi_bands(fig, y_min, y_max, cutoffs):
+    """Shade the bottom / middle / top HI terciles (red -> yellow -> green)."""
+    if cutoffs is None:
+        return fig
+    edges = [y_min, max(y_min, min(cutoffs[0], y_max)), max(y_min, min(cutoffs[1], y_max)), y_max]
+    for y0, y1, color in zip(edges, edges[1:], HI_BAND_COLORS):
+        if y1 > y0:
+            fig.add_hrect(y0=y0, y1=y1, fillcolor=color, line_width=0, layer="below")
+    return fig
+
+
+# -----------------------------
+# Loading (CSV or shared memory-mapped file)
+# -----------------------------
+def cache_loader(func):
+    """
+    Cache a page loader.
+    With a shared dataset attached, use cache_resource so the memory-mapped
+    columns are handed out as-is instead of being pickled per session.
+    """
+    if SHARED_DATA_PATH:
+        return st.cache_resource(func)
+    return st.cache_data(func)
+
+
+def read_daily():
+    """Daily rows in the mood_all_years.csv schema."""
+    if SHARED_DATA_PATH:
+        # Shallow copy: columns still point into the mapping, but loaders
+        # can add their own derived columns without touching the shared frame
+        return attach_shared_dataset(SHARED_DATA_PATH)["daily"].copy(deep=False)
+    return pd.read_csv(DAILY_CSV, parse_dates=["date"])
+
+
+def read_monthly():
+    """Monthly happiness index rows in the mood_monthly_hi.csv schema."""
+    if SHARED_DATA_PATH:
+        return attach_shared_dataset(SHARED_DATA_PATH)["monthly"].copy(deep=False)
+    return pd.read_csv(MONTHLY_CSV)
+
+
+def dataset_version():
+    """Identifier that changes whenever the daily data does (for cache keys)."""
+    if SHARED_DATA_PATH:
+        return attach_shared_dataset(SHARED_DATA_PATH)["version"]
+    stat = os.stat(DAILY_CSV)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def load_prefix(df):
+    """Prefix sums for df, taken from the shared file when one is attached."""
+    if SHARED_DATA_PATH:
+        return attach_shared_dataset(SHARED_DATA_PATH)["prefix"]
+    return build_prefix_sums(df)
+
+
+def load_hi_sketch(df_monthly):
+    """
+    HI sketch for the monthly rows: from the shared file when one is attached,
+    else the per-year sketches in HI_SKETCH_CSV (built from df_monthly if missing).
+    """
+    if SHARED_DATA_PATH:
+        return attach_shared_dataset(SHARED_DATA_PATH)["hi_sketch"]
+    sketch = read_hi_sketch()
+    return build_hi_sketch(df_monthly["happiness_index"]) if sketch is None else sketch
+
+
+# -----------------------------
+# Shared memory-mapped dataset
+# -----------------------------
+_ALIGN = 64
+
+# File layout: magic, header length (uint64 LE), JSON manifest, aligned arrays
+_MAGIC = b"MOODSHM2"
+
+
+def _frame_arrays(name, df):
+    """
+    Split a frame into raw column arrays plus manifest entries.
+    Text columns are stored as categorical codes; their labels go in the manifest.
+    """
+    arrays, columns = {}, []
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            arrays[f"{name}/{col}"] = s.to_numpy("datetime64[s]")
+            columns.append({"name": col, "kind": "datetime"})
+        elif pd.api.types.is_numeric_dtype(s):
+            arrays[f"{name}/{col}"] = s.to_numpy()
+            columns.append({"name": col, "kind": "numeric"})
+        else:
+            cat = pd.Categorical(s)
+            arrays[f"{name}/{col}"] = cat.codes
+            columns.append({"name": col, "kind": "category", "categories": cat.categories.tolist()})
+    return arrays, columns
+
+
+def write_shared_dataset(path, df_all=None, df_monthly=None):
+    """
+    Write the daily rows, monthly HI, prefix sums and HI sketch to one raw
+    file at path. The JSON manifest of array offsets is the file's header,
+    so a single atomic replace swaps data and manifest together: a worker
+    attaching mid-rebuild maps either the old pair or the new one.
+    Returns the manifest.
+    """
+    sketch = read_hi_sketch() if df_monthly is None else None
+    df_all = pd.read_csv(DAILY_CSV, parse_dates=["date"]) if df_all is None else df_all
+    df_monthly = pd.read_csv(MONTHLY_CSV) if df_monthly is None else df_monthly
+    prefix = build_prefix_sums(df_all)
+
+    daily_arrays, daily_cols = _frame_arrays("daily", df_all)
+    monthly_arrays, monthly_cols = _frame_arrays("monthly", df_monthly)
+    arrays = {**daily_arrays, **monthly_arrays}
+    for key in ["days", "score_sum", "scored"]:
+        arrays[f"prefix/{key}"] = prefix[key]
+    arrays["hi_sketch"] = build_hi_sketch(df_monthly["happiness_index"]) if sketch is None else sketch
+
+    # Lay the arrays out first: their offsets (relative to the data section) go in the header
+    entries, chunks = {}, []
+    size = 0
+    digest = hashlib.sha1()
+    for key, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        size += -size % _ALIGN
+        entries[key] = {"offset": size, "dtype": arr.dtype.str, "shape": list(arr.shape)}
+        chunks.append((size, arr))
+        digest.update(arr.tobytes())
+        size += arr.nbytes
+
+    manifest = {
+        "version": digest.hexdigest()[:12],
+        "arrays": entries,
+        "daily": daily_cols,
+        "monthly": monthly_cols,
+        "prefix": {k: prefix[k] for k in ["first", "last", "emotions", "scores", "colors"]},
+    }
+    header = json.dumps(manifest).encode()
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_MAGIC + len(header).to_bytes(8, "little") + header)
+        start = _data_start(len(header))
+        for offset, arr in chunks:
+            f.write(b"\0" * (start + offset - f.tell()))
+            f.write(arr.tobytes())
+    os.replace(tmp, path)
+    return manifest
+
+
+def _data_start(header_len):
+    """File offset of the (aligned) data section after a header of header_len bytes."""
+    end = len(_MAGIC) + 8 + header_len
+    return end + (-end % _ALIGN)
+
+
+def is_shared_dataset(path):
+    """True if path is a shared dataset file in the current layout."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(_MAGIC)) == _MAGIC
+    except OSError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def attach_shared_dataset(path):
+    """
+    Map a file written by write_shared_dataset read-only (once per process).
+    Numeric columns and prefix arrays are zero-copy views into the mapping.
+    Returns {"version", "daily", "monthly", "prefix", "hi_sketch"}.
+    """
+    if not is_shared_dataset(path):
+        raise ValueError(f"{path} is not a shared dataset file (rebuild it: python -m scripts.serve_workers --rebuild)")
+    buf = np.memmap(path, mode="r", dtype=np.uint8)
+    header_len = int.from_bytes(bytes(buf[len(_MAGIC):len(_MAGIC) + 8]), "little")
+    manifest = json.loads(bytes(buf[len(_MAGIC) + 8:len(_MAGIC) + 8 + header_len]))
+    buf = buf[_data_start(header_len):]
+
+    def view(key):
+        e = manifest["arrays"][key]
+        dtype = np.dtype(e["dtype"])
+        count = int(np.prod(e["shape"]))
+        return buf[e["offset"]:e["offset"] + count * dtype.itemsize].view(dtype).reshape(e["shape"])
+
+    def frame(name):
+        data = {}
+        for c in manifest[name]:
+            arr = view(f"{name}/{c['name']}")
+            if c["kind"] == "category":
+                arr = pd.Categorical.from_codes(arr, categories=c["categories"])
+            data[c["name"]] = arr
+        return pd.DataFrame(data, copy=False)
+
+    prefix = dict(manifest["prefix"])
+    for key in ["days", "score_sum", "scored"]:
+        prefix[key] = view(f"prefix/{key}")
+
+    return {
+        "version": manifest["version"],
+        "daily": frame("daily"),
+        "monthly": frame("monthly"),
+        "prefix": prefix,
+        "hi_sketch": view("hi_sketch"),
+    }
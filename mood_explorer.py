@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from mood_data import (
+    EMOTIONS,
+    cache_loader,
+    hi_band_cutoffs,
+    load_hi_sketch,
+    load_prefix,
+    read_daily,
+    read_monthly,
+)
+
+COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "mood_explorer")
+
+# Not committed: `make component-assets` copies it from the installed plotly package
+PLOTLY_JS = os.path.join(COMPONENT_DIR, "plotly.min.js")
+
+# Bumped whenever the payload layout changes, so the frontend can reject stale data
+PAYLOAD_SCHEMA = 1
+
+
+# -----------------------------
+# Compact month aggregates for the browser
+# -----------------------------
+def build_month_aggregates(prefix, df_monthly, hi_cutoffs, version):
+    """
+    Year x month x emotion day counts and score sums, sliced out of the
+    prefix sums, plus the monthly HI and band cutoffs. A few KB of JSON;
+    the component filters and charts it client-side.
+
+    months[i] = year * 12 + month - 1; days / score_sum are row-major
+    (months x emotions); hi[i] is None where the month has no HI row.
+    """
+    first = pd.Timestamp.fromordinal(prefix["first"])
+    last = pd.Timestamp.fromordinal(prefix["last"])
+    starts = pd.date_range(first.replace(day=1), last, freq="MS")
+    months = (starts.year * 12 + starts.month - 1).to_numpy(dtype=np.int64)
+
+    # Prefix row of each month's first day (and one past the last month)
+    n = len(prefix["scored"]) - 1
+    bounds = np.append(
+        np.array([d.toordinal() for d in starts.date], dtype=np.int64) - prefix["first"],
+        n,
+    ).clip(0, n)
+
+    days = np.diff(prefix["days"][bounds], axis=0)
+    score_sum = np.diff(prefix["score_sum"][bounds], axis=0)
+    scored = np.diff(prefix["scored"][bounds])
+
+    hi_by_month = dict(zip(
+        (df_monthly["year"].astype(int) * 12 + df_monthly["month"].astype(int) - 1).tolist(),
+        pd.to_numeric(df_monthly["happiness_index"], errors="coerce").tolist(),
+    ))
+    hi = [hi_by_month.get(m) for m in months.tolist()]
+
+    return {
+        "schema": PAYLOAD_SCHEMA,
+        "version": str(version),
+        "months": months.tolist(),
+        "emotions": list(prefix["emotions"]),
+        "scores": [int(s) for s in prefix["scores"]],
+        "colors": list(prefix["colors"]),
+        "days": days.ravel().tolist(),
+        "score_sum": np.round(score_sum, 6).ravel().tolist(),
+        "scored": scored.tolist(),
+        "hi": [None if v is None or pd.isna(v) else int(round(v)) for v in hi],
+        "hi_cutoffs": list(hi_cutoffs) if hi_cutoffs else None,
+        "legend": [label for label, _, _ in EMOTIONS],
+    }
+
+
+@cache_loader
+def load_month_aggregates(version):
+    """Explorer payload for the current dataset, built once per dataset version."""
+    df_all = read_daily()
+    df_monthly = read_monthly()
+    cutoffs = hi_band_cutoffs(load_hi_sketch(df_monthly))
+    return build_month_aggregates(load_prefix(df_all), df_monthly, cutoffs, version)
+
+
+# -----------------------------
+# Component
+# -----------------------------
+def explorer_available():
+    """True once plotly.js has been staged for the component (make component-assets)."""
+    return os.path.exists(PLOTLY_JS)
+
+
+_component = components.declare_component("mood_explorer", path=COMPONENT_DIR)
+
+
+def mood_explorer(view, payload, key=None, **options):
+    """
+    Render one explorer view ("overview", "monthly" or "emotions").
+    Its filters live in the browser: changing them re-renders the charts
+    from payload without a script rerun. Never returns a value.
+
+    payload goes over the wire once per session and dataset version; later
+    reruns send only its version and the browser reuses its copy. A frame
+    that has lost it (remounted with storage unavailable) asks again through
+    the component value, which costs one rerun.
+    """
+    key = key or f"mood_explorer_{view}"
+    sent = st.session_state.setdefault("_mood_explorer_sent", {}).setdefault(key, {})
+    request = (st.session_state.get(key) or {}).get("id")  # set by a frame that lost its copy
+    resend = sent.get("version") != payload["version"] or (request is not None and request != sent.get("request"))
+
+    _component(
+        view=view,
+        version=payload["version"],
+        payload=payload if resend else None,
+        options=options,
+        key=key,
+        default=None,
+    )
+    sent.update(version=payload["version"], request=request)
@@ -1,9 +1,29 @@
 import calendar
+from datetime import date, timedelta
 
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from mood_data import (
+    add_hi_bands,
+    build_partition_index,
+    cache_loader,
+    dataset_version,
+    date_slice,
+    hi_band_cutoffs,
+    load_hi_sketch,
+    load_prefix,
+    period_slice,
+    prefix_bounds,
+    range_avg_score,
+    range_summary,
+    read_daily,
+    read_monthly,
+    sort_by_period,
+)
+from mood_explorer import explorer_available, load_month_aggregates, mood_explorer
+
 # Widen page content beyond default container
 st.markdown(
     """
@@ -24,11 +44,10 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-@st.cache_data
+@cache_loader
 def load_data():
-    df_all = pd.read_csv("data/mood_all_years.csv", parse_dates=["date"])
-    df_monthly = pd.read_csv("data/mood_monthly_hi.csv")
-    df_year_emotion = pd.read_csv("data/mood_year_emotion_breakdown.csv")
+    df_all = sort_by_period(read_daily())
+    df_monthly = sort_by_period(read_monthly())
 
     for c in ["year", "month", "day", "score"]:
         if c in df_all.columns:
@@ -37,23 +56,56 @@ def load_data():
     for c in ["year", "month", "happiness_index"]:
         if c in df_monthly.columns:
             df_monthly[c] = pd.to_numeric(df_monthly[c], errors="coerce")
+    df_monthly["year_month"] = pd.to_datetime(
+        df_monthly["year"].astype(int).astype(str) + "-" + df_monthly["month"].astype(int).astype(str) + "-01"
+    )
 
-    if "pct_days" in df_year_emotion.columns:
-        df_year_emotion["pct_days"] = pd.to_numeric(df_year_emotion["pct_days"], errors="coerce")
+    prefix = load_prefix(df_all)
+    hi_cutoffs = hi_band_cutoffs(load_hi_sketch(df_monthly))
 
-    return df_all, df_monthly, df_year_emotion
+    return df_all, df_monthly, build_partition_index(df_monthly), prefix, hi_cutoffs
 
-df_all, df_monthly, df_year_emotion = load_data()
+df_all, df_monthly, monthly_index, prefix, hi_cutoffs = load_data()
 
 st.title("Overview")
 
 years = sorted(df_all["year"].dropna().unique().astype(int))
 default_year = years[-1] if years else None
-year = st.sidebar.selectbox("Year", years, index=len(years)-1)
+period = st.sidebar.radio("Period", ["Year", "Date range"], horizontal=True)
+
+if period == "Year":
+    client_side = explorer_available() and st.sidebar.toggle(
+        "Filter in browser",
+        value=True,
+        help="Switch years in the page itself, without a round trip to the server.",
+    )
+    if client_side:
+        mood_explorer("overview", load_month_aggregates(dataset_version()))
+        # The year picked in the browser never reaches the server: the raw rows get their own picker
+        with st.expander("Show raw data (year)"):
+            raw_year = st.selectbox("Raw data year", years, index=len(years)-1)
+            st.dataframe(date_slice(df_all, date(raw_year, 1, 1), date(raw_year, 12, 31)), use_container_width=True)
+        st.stop()
+    year = st.sidebar.selectbox("Year", years, index=len(years)-1)
+    start, end = date(year, 1, 1), date(year, 12, 31)
+    period_label = str(year)
+else:
+    first_day, last_day = prefix_bounds(prefix)
+    picked = st.sidebar.date_input(
+        "Date range",
+        value=(max(first_day, last_day - timedelta(days=89)), last_day),
+        min_value=first_day,
+        max_value=last_day,
+    )
+    if len(picked) != 2:
+        st.info("Pick an end date to complete the range.")
+        st.stop()
+    start, end = picked
+    period_label = f"{start:%b %d, %Y} – {end:%b %d, %Y}"
 
-# Filter
-dfy_all = df_all[df_all["year"] == year].copy()
-dfy_monthly = df_monthly[df_monthly["year"] == year].copy().sort_values("month")
+# Filter (emotion totals come straight from the prefix sums)
+emotion_totals = range_summary(prefix, start, end)
+dfy_monthly = period_slice(df_monthly, monthly_index, (start.year, start.month), (end.year, end.month))
 
 # Best month summary
 best_month_value = "N/A"
@@ -65,31 +117,37 @@ if not dfy_monthly.empty and dfy_monthly["happiness_index"].notna().any():
     best_month_value = (
         calendar.month_abbr[int(month_num)] if pd.notna(month_num) else "Unknown"
     )
+    if period != "Year":
+        best_month_value = f"{best_month_value} {int(best_month_row['year'])}"
     worst_month_idx = dfy_monthly["happiness_index"].idxmin()
     worst_month_row = dfy_monthly.loc[worst_month_idx]
     worst_month_num = worst_month_row.get("month")
     worst_month_value = (
         calendar.month_abbr[int(worst_month_num)] if pd.notna(worst_month_num) else "Unknown"
     )
+    if period != "Year":
+        worst_month_value = f"{worst_month_value} {int(worst_month_row['year'])}"
 
 # KPIs
 def emotion_for_score(score_value: int):
     """Return the most common emotion for a given rounded score."""
     if score_value is None:
         return None
-    in_year = dfy_all[dfy_all["score"].round() == score_value]
-    pool = in_year if not in_year.empty else df_all[df_all["score"].round() == score_value]
-    if pool.empty or "emotion" not in pool.columns:
+    in_range = emotion_totals[(emotion_totals["score"] == score_value) & (emotion_totals["days"] > 0)]
+    if in_range.empty:
+        in_range = range_summary(prefix, *prefix_bounds(prefix))
+        in_range = in_range[(in_range["score"] == score_value) & (in_range["days"] > 0)]
+    if in_range.empty:
         return None
-    return pool["emotion"].mode().iat[0]
+    return in_range.loc[in_range["days"].idxmax(), "emotion"]
 
-avg_score_raw = dfy_all["score"].mean()
-avg_score_rounded = int(round(avg_score_raw)) if pd.notna(avg_score_raw) else None
+avg_score_raw = range_avg_score(prefix, start, end)
+avg_score_rounded = int(round(avg_score_raw)) if avg_score_raw is not None else None
 avg_emotion = emotion_for_score(avg_score_rounded) or "N/A"
 avg_help = f"Rounded score: {avg_score_rounded}" if avg_score_rounded is not None else None
 
 col1, col2, col3, col4 = st.columns(4)
-col1.metric("Days logged", int(dfy_all["date"].nunique()))
+col1.metric("Days logged", int(emotion_totals["days"].sum()))
 col2.metric("Avg daily emotion", avg_emotion, help=avg_help)
 col3.metric("Best month", best_month_value)
 col4.metric("Worst month", worst_month_value)
@@ -99,16 +157,14 @@ st.divider()
 # Monthly HI
 fig = px.line(
     dfy_monthly,
-    x="month",
+    x="month" if period == "Year" else "year_month",
     y="happiness_index",
     markers=True,
-    title=f"Monthly Happiness Index — {year}"
+    title=f"Monthly Happiness Index — {period_label}"
 )
-fig.update_xaxes(dtick=1)
+if period == "Year":
+    fig.update_xaxes(dtick=1)
 min_hi = dfy_monthly["happiness_index"].min() if not dfy_monthly.empty else None
-low_cutoff = 221
-mid_cutoff = 239  # adjust if you want a different upper bound
-high_cutoff = 240
 max_hi = dfy_monthly["happiness_index"].max() if not dfy_monthly.empty else None
 margin = (
     max(10, 0.15 * (max_hi - min_hi))
@@ -116,41 +172,10 @@ margin = (
     else 10
 )
 y_min = max(0, (min_hi - margin)) if min_hi is not None else 0
-y_max = (max_hi + margin) if max_hi is not None else (high_cutoff + 10)
-
-# Background bands for happiness index thresholds
-band1_y0 = y_min
-band1_y1 = min(low_cutoff, y_max)
-if band1_y1 > band1_y0:
-    fig.add_hrect(
-        y0=band1_y0,
-        y1=band1_y1,
-        fillcolor="rgba(255,0,0,0.07)",
-        line_width=0,
-        layer="below",
-    )
+y_max = (max_hi + margin) if max_hi is not None else ((hi_cutoffs[1] if hi_cutoffs else 0) + 10)
 
-band2_y0 = max(low_cutoff, y_min)
-band2_y1 = min(mid_cutoff, y_max)
-if band2_y1 > band2_y0:
-    fig.add_hrect(
-        y0=band2_y0,
-        y1=band2_y1,
-        fillcolor="rgba(255,215,0,0.08)",
-        line_width=0,
-        layer="below",
-    )
-
-band3_y0 = max(high_cutoff, y_min)
-band3_y1 = y_max
-if band3_y1 > band3_y0:
-    fig.add_hrect(
-        y0=band3_y0,
-        y1=band3_y1,
-        fillcolor="rgba(0,128,0,0.07)",
-        line_width=0,
-        layer="below",
-    )
+# Background bands: terciles of every month's HI in the dataset
+add_hi_bands(fig, y_min, y_max, hi_cutoffs)
 
 fig.update_yaxes(title="happiness_index", range=[y_min, y_max])
 st.plotly_chart(fig, use_container_width=True)
@@ -158,10 +183,7 @@ st.plotly_chart(fig, use_container_width=True)
 st.divider()
 
 # Emotion distribution (days)
-emotion_counts = (
-    dfy_all.groupby("emotion", as_index=False)
-    .agg(days=("date", "count"), total=("score", "sum"))
-)
+emotion_counts = emotion_totals[emotion_totals["days"] > 0][["emotion", "days", "total"]].copy()
 emotion_order = [
     "Happy",
     "Productive",
@@ -180,9 +202,7 @@ emotion_counts["emotion"] = pd.Categorical(
 )
 emotion_counts = emotion_counts.sort_values("emotion")
 emotion_color_map = (
-    dfy_all[["emotion", "color_hex"]]
-    .dropna(subset=["emotion", "color_hex"])
-    .drop_duplicates(subset="emotion", keep="first")
+    emotion_totals.dropna(subset=["color_hex"])
     .set_index("emotion")["color_hex"]
     .to_dict()
 )
@@ -214,5 +234,5 @@ with c2:
     )
     st.plotly_chart(fig3, use_container_width=True)
 
-with st.expander("Show raw data (year)"):
-    st.dataframe(dfy_all.sort_values("date"), use_container_width=True)
+with st.expander(f"Show raw data ({'year' if period == 'Year' else 'range'})"):
+    st.dataframe(date_slice(df_all, start, end), use_container_width=True)
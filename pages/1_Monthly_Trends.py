@@ -4,6 +4,19 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
+from mood_data import (
+    add_hi_bands,
+    build_partition_index,
+    cache_loader,
+    dataset_version,
+    hi_band_cutoffs,
+    load_hi_sketch,
+    period_slice,
+    read_monthly,
+    sort_by_period,
+)
+from mood_explorer import explorer_available, load_month_aggregates, mood_explorer
+
 # Widen content on this page
 st.markdown(
     """
@@ -20,34 +33,25 @@ st.markdown(
 
 MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
 
-@st.cache_data
+@cache_loader
 def load_monthly():
-    df = pd.read_csv("data/mood_monthly_hi.csv")
+    df = sort_by_period(read_monthly())
     df["year"] = df["year"].astype(int)
     df["month"] = df["month"].astype(int)
     df["happiness_index"] = pd.to_numeric(df["happiness_index"], errors="coerce").round(0).astype("Int64")
     df["month_name"] = df["month"].map(lambda m: MONTH_NAMES[m-1])
     df["year_month"] = pd.to_datetime(df["year"].astype(str) + "-" + df["month"].astype(str) + "-01")
-    return df.dropna(subset=["happiness_index"]).copy()
-
-def add_hi_bands(fig, y_min, y_max):
-    """
-    Adds subtle background bands (red -> yellow -> green).
-    Keeps the look similar to your Overview chart.
-    """
-    # Clamp if range is tight
-    span = max(1, y_max - y_min)
-    a = y_min + 0.33 * span
-    b = y_min + 0.66 * span
+    df = df.dropna(subset=["happiness_index"]).reset_index(drop=True)
+    return df, build_partition_index(df), hi_band_cutoffs(load_hi_sketch(df))
 
-    fig.add_hrect(y0=y_min, y1=a, fillcolor="rgba(255,0,0,0.08)", line_width=0)
-    fig.add_hrect(y0=a, y1=b, fillcolor="rgba(255,255,0,0.07)", line_width=0)
-    fig.add_hrect(y0=b, y1=y_max, fillcolor="rgba(0,255,0,0.08)", line_width=0)
-    return fig
+def hi_table(rows):
+    """Monthly HI rows as shown in the "Show table" expander."""
+    out = rows[["year","month","month_name","happiness_index","source_sheet"]].copy()
+    return out.sort_values(["year","month"]).reset_index(drop=True)
 
 st.title("Monthly Trends")
 
-dfm = load_monthly()
+dfm, monthly_index, hi_cutoffs = load_monthly()
 years = sorted(dfm["year"].unique().tolist())
 if not years:
     st.error("No monthly data found in data/mood_monthly_hi.csv")
@@ -57,12 +61,7 @@ if not years:
 # Sidebar controls
 # -----------------------------
 st.sidebar.subheader("Filters")
-year_min, year_max = st.sidebar.slider(
-    "Year range",
-    min_value=int(min(years)),
-    max_value=int(max(years)),
-    value=(int(min(years)), int(max(years)))
-)
+range_slot = st.sidebar.container()
 
 mode = st.sidebar.radio(
     "View",
@@ -70,10 +69,37 @@ mode = st.sidebar.radio(
     index=0
 )
 
+# The trend view can run its year-range filter in the browser instead
+if mode == "Trend over time" and explorer_available() and st.sidebar.toggle(
+    "Filter in browser",
+    value=True,
+    help="Pick the year range in the page itself, without a round trip to the server.",
+):
+    mood_explorer("monthly", load_month_aggregates(dataset_version()))
+    # The range picked in the browser never reaches the server: the table gets its own slider
+    with st.expander("Show table (selected range)"):
+        table_min, table_max = st.slider(
+            "Table year range",
+            min_value=int(min(years)),
+            max_value=int(max(years)),
+            value=(int(min(years)), int(max(years)))
+        )
+        rows = period_slice(dfm, monthly_index, (table_min, 1), (table_max, 12))
+        st.dataframe(hi_table(rows), use_container_width=True)
+    st.stop()
+
+with range_slot:
+    year_min, year_max = st.slider(
+        "Year range",
+        min_value=int(min(years)),
+        max_value=int(max(years)),
+        value=(int(min(years)), int(max(years)))
+    )
+
 show_rolling = st.sidebar.checkbox("Show 3-month rolling average", value=True)
 
-df = dfm[(dfm["year"] >= year_min) & (dfm["year"] <= year_max)].sort_values(["year","month"]).copy()
-df_hi = df.dropna(subset=["happiness_index"]).copy()
+df = period_slice(dfm, monthly_index, (year_min, 1), (year_max, 12))
+df_hi = df  # load_monthly already dropped missing HI
 if df_hi.empty:
     st.warning("No happiness index data available for the selected range.")
     st.stop()
@@ -117,7 +143,7 @@ if mode == "Trend over time":
         yaxis_title="Happiness Index",
         legend_title="",
     )
-    fig = add_hi_bands(fig, y_min, y_max)
+    fig = add_hi_bands(fig, y_min, y_max, hi_cutoffs)
     st.plotly_chart(fig, use_container_width=True)
 
     # Quick “best/worst” summary for the selected range
@@ -133,9 +159,7 @@ if mode == "Trend over time":
     c3.metric("Worst month", f"{worst_row['month_name']} {worst_row['year']}", int(worst_row["happiness_index"]))
 
     with st.expander("Show table (selected range)"):
-        out = df_hi[["year","month","month_name","happiness_index","source_sheet"]].copy()
-        out = out.sort_values(["year","month"]).reset_index(drop=True)
-        st.dataframe(out, use_container_width=True)
+        st.dataframe(hi_table(df_hi), use_container_width=True)
 
 # -----------------------------
 # 2) Compare years (same-month YoY)
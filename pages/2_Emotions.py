@@ -2,6 +2,21 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+from datetime import timedelta
+
+from mood_data import (
+    build_partition_index,
+    cache_loader,
+    dataset_version,
+    load_prefix,
+    month_slice,
+    prefix_bounds,
+    range_avg_score,
+    range_summary,
+    read_daily,
+    sort_by_period,
+)
+from mood_explorer import explorer_available, load_month_aggregates, mood_explorer
 
 MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
 
@@ -22,9 +37,9 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-@st.cache_data
+@cache_loader
 def load_all():
-    df = pd.read_csv("data/mood_all_years.csv", parse_dates=["date"])
+    df = sort_by_period(read_daily())
     df["year"] = df["year"].astype(int)
     df["month"] = df["month"].astype(int)
     df["day"] = df["day"].astype(int)
@@ -33,9 +48,9 @@ def load_all():
     df["year_month"] = pd.to_datetime(
         df["year"].astype(str) + "-" + df["month"].astype(str) + "-01"
     )
-    return df
+    return df, build_partition_index(df), load_prefix(df)
 
-df = load_all()
+df, daily_index, prefix = load_all()
 
 st.title("Emotion Analysis")
 
@@ -61,144 +76,208 @@ ordered_emotions = [e for e in EMOTION_ORDER if e in all_emotions]
 remaining = [e for e in all_emotions if e not in EMOTION_ORDER]
 ordered_emotions.extend(sorted(remaining))
 
+# Date range (served from the prefix-sum arrays)
+first_day, last_day = prefix_bounds(prefix)
+picked = st.sidebar.date_input(
+    "Date range",
+    value=(first_day, last_day),
+    min_value=first_day,
+    max_value=last_day,
+)
+range_start, range_end = picked if len(picked) == 2 else (picked[0], last_day)
+client_side = explorer_available() and st.sidebar.toggle(
+    "Filter in browser",
+    value=True,
+    help="Switch emotions in the page itself, without a round trip to the server.",
+)
+
 # ----------------------------
 # Section 1 — Emotion trend over time
 # ----------------------------
-# Create inline subheader with dropdown: [Emotion] over time
-subheader_container = st.container()
-with subheader_container:
-    # TO ADJUST DROPDOWN WIDTH: Change the column ratios below (e.g., [0.28, 0.72] → [0.35, 0.65] for wider dropdown)
-    header_col1, header_col2 = st.columns([0.28, 2])
-    with header_col1:
-        emotion = st.selectbox(
-            "Emotion",
-            ordered_emotions,
-            index=ordered_emotions.index("Happy") if "Happy" in ordered_emotions else 0,
-            label_visibility="collapsed",
-            key="emotion_select"
+if client_side:
+    # Trend, seasonality and volatility for any emotion, filtered in the browser
+    mood_explorer(
+        "emotions",
+        load_month_aggregates(dataset_version()),
+        x_range=[str(range_start - timedelta(days=15)), str(range_end + timedelta(days=15))],
+    )
+    emotion = None
+else:
+    # Create inline subheader with dropdown: [Emotion] over time
+    subheader_container = st.container()
+    with subheader_container:
+        # TO ADJUST DROPDOWN WIDTH: Change the column ratios below (e.g., [0.28, 0.72] → [0.35, 0.65] for wider dropdown)
+        header_col1, header_col2 = st.columns([0.28, 2])
+        with header_col1:
+            emotion = st.selectbox(
+                "Emotion",
+                ordered_emotions,
+                index=ordered_emotions.index("Happy") if "Happy" in ordered_emotions else 0,
+                label_visibility="collapsed",
+                key="emotion_select"
+            )
+        with header_col2:
+            st.markdown(f"<h4 style='margin-top: 0; padding-top: 12px; margin-bottom: 0;'>over time</h4>", unsafe_allow_html=True)
+
+    metric = "Days"
+
+    trend = (
+        df[df["emotion"] == emotion]
+        .groupby(["year", "month", "year_month"], as_index=False)
+        .agg(
+            days=("date", "count"),
+            avg_score=("score", "mean"),
         )
-    with header_col2:
-        st.markdown(f"<h4 style='margin-top: 0; padding-top: 12px; margin-bottom: 0;'>over time</h4>", unsafe_allow_html=True)
-
-metric = "Days"
-
-trend = (
-    df[df["emotion"] == emotion]
-    .groupby(["year", "month", "year_month"], as_index=False)
-    .agg(
-        days=("date", "count"),
-        avg_score=("score", "mean"),
+        .sort_values("year_month")
     )
-    .sort_values("year_month")
-)
 
-y_col = "days" if metric == "Days" else "avg_score"
+    y_col = "days" if metric == "Days" else "avg_score"
 
-fig = px.line(
-    trend,
-    x="year_month",
-    y=y_col,
-    markers=True,
-    title=f"{emotion} — {metric} over time"
-)
+    fig = px.line(
+        trend,
+        x="year_month",
+        y=y_col,
+        markers=True,
+        title=f"{emotion} — {metric} over time"
+    )
 
 
-trend["roll3"] = trend[y_col].rolling(3, min_periods=1).mean()
-fig.add_scatter(
-    x=trend["year_month"],
-    y=trend["roll3"],
-    mode="lines",
-    name="3-month avg",
-    line=dict(dash="dash")
-)
+    trend["roll3"] = trend[y_col].rolling(3, min_periods=1).mean()
+    fig.add_scatter(
+        x=trend["year_month"],
+        y=trend["roll3"],
+        mode="lines",
+        name="3-month avg",
+        line=dict(dash="dash")
+    )
 
-# Position the legend in the top right
-fig.update_layout(
-    height=420,
-    xaxis_title="",
-    yaxis_title="",
-    legend=dict(
-        x=0.98,
-        y=0.98,
-        xanchor="right",
-        yanchor="top"
+    # Position the legend in the top right
+    fig.update_layout(
+        height=420,
+        xaxis_title="",
+        yaxis_title="",
+        legend=dict(
+            x=0.98,
+            y=0.98,
+            xanchor="right",
+            yanchor="top"
+        )
     )
-)
+    fig.update_xaxes(range=[range_start - timedelta(days=15), range_end + timedelta(days=15)])
 
-st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, use_container_width=True)
 
 st.divider()
 
 # ----------------------------
-# Section 2 — Seasonality heatmap
+# Section 2 — Selected range summary
 # ----------------------------
-st.subheader("Seasonality (emotion × month)")
-
-heat = (
-    df[df["emotion"] == emotion]
-    .groupby(["year", "month"], as_index=False)
-    .agg(days=("date", "count"))
+st.subheader(f"{range_start:%b %d, %Y} – {range_end:%b %d, %Y}")
+
+totals = range_summary(prefix, range_start, range_end)
+total_days = int(totals["days"].sum())
+avg_score = range_avg_score(prefix, range_start, range_end)
+
+c1, c2, c3 = st.columns(3)
+if emotion is None:
+    top = totals.loc[totals["days"].idxmax()] if total_days else None
+    c1.metric("Days logged", total_days)
+    c2.metric("Most common", top["emotion"] if top is not None else "N/A")
+else:
+    emo_days = int(totals.loc[totals["emotion"] == emotion, "days"].sum())
+    c1.metric(f"{emotion} days", emo_days)
+    c2.metric("Share of days", f"{(100 * emo_days / total_days) if total_days else 0:.1f}%")
+c3.metric("Avg score (all emotions)", round(avg_score, 2) if avg_score is not None else "N/A")
+
+bar_data = totals[totals["days"] > 0].sort_values("days", ascending=False)
+fig_range = px.bar(
+    bar_data,
+    x="emotion",
+    y="days",
+    color="emotion",
+    color_discrete_map=dict(zip(totals["emotion"], totals["color_hex"])),
+    title="Days by Emotion",
 )
+fig_range.update_layout(height=360, xaxis_title="", yaxis_title="", showlegend=False)
+st.plotly_chart(fig_range, use_container_width=True)
 
-pivot = (
-    heat.pivot(index="year", columns="month", values="days")
-        .reindex(columns=range(1,13))
-        .astype(float)
-)
+st.divider()
 
-pivot.columns = [MONTH_NAMES[m-1] for m in pivot.columns]
+if not client_side:
+    # ----------------------------
+    # Section 3 — Seasonality heatmap
+    # ----------------------------
+    st.subheader("Seasonality (emotion × month)")
 
-fig_hm = px.imshow(
-    pivot,
-    aspect="auto",
-    title=f"{emotion} — days per month",
-    color_continuous_scale="Blues_r",  # Reversed scale: darker = more frequent
-)
-fig_hm.update_layout(height=520, xaxis_title="", yaxis_title="")
-st.plotly_chart(fig_hm, use_container_width=True)
+    heat = (
+        df[df["emotion"] == emotion]
+        .groupby(["year", "month"], as_index=False)
+        .agg(days=("date", "count"))
+    )
 
-st.divider()
+    pivot = (
+        heat.pivot(index="year", columns="month", values="days")
+            .reindex(columns=range(1,13))
+            .astype(float)
+    )
 
-# ----------------------------
-# Section 3 — Volatility by year
-# ----------------------------
-st.subheader("Yearly volatility")
+    pivot.columns = [MONTH_NAMES[m-1] for m in pivot.columns]
 
-vol = (
-    trend.groupby("year", as_index=False)
-    .agg(
-        avg_days=("days", "mean"),
-        std_days=("days", "std"),
+    fig_hm = px.imshow(
+        pivot,
+        aspect="auto",
+        title=f"{emotion} — days per month",
+        color_continuous_scale="Blues_r",  # Reversed scale: darker = more frequent
     )
-)
+    fig_hm.update_layout(height=520, xaxis_title="", yaxis_title="")
+    st.plotly_chart(fig_hm, use_container_width=True)
 
-fig_vol = px.bar(
-    vol,
-    x="year",
-    y="std_days",
-    title=f"{emotion} — volatility (std dev of monthly days)",
-)
-fig_vol.update_layout(height=360, xaxis_title="", yaxis_title="Std dev")
-st.plotly_chart(fig_vol, use_container_width=True)
+    st.divider()
 
-st.divider()
+    # ----------------------------
+    # Section 4 — Volatility by year
+    # ----------------------------
+    st.subheader("Yearly volatility")
+
+    vol = (
+        trend.groupby("year", as_index=False)
+        .agg(
+            avg_days=("days", "mean"),
+            std_days=("days", "std"),
+        )
+    )
+
+    fig_vol = px.bar(
+        vol,
+        x="year",
+        y="std_days",
+        title=f"{emotion} — volatility (std dev of monthly days)",
+    )
+    fig_vol.update_layout(height=360, xaxis_title="", yaxis_title="Std dev")
+    st.plotly_chart(fig_vol, use_container_width=True)
+
+    st.divider()
 
 # ----------------------------
-# Section 4 — Drill-down
+# Section 5 — Drill-down
 # ----------------------------
 st.subheader("Drill-down")
 
-c1, c2 = st.columns(2)
+c1, c2, c3 = st.columns(3)
 with c1:
     yr = st.selectbox("Year", sorted(df["year"].unique()))
 with c2:
     mo = st.selectbox("Month", list(range(1,13)), format_func=lambda m: MONTH_NAMES[m-1])
+if client_side:
+    with c3:
+        emotion = st.selectbox(
+            "Drill-down emotion",
+            ordered_emotions,
+            index=ordered_emotions.index("Happy") if "Happy" in ordered_emotions else 0,
+        )
 
-drill = df[
-    (df["emotion"] == emotion) &
-    (df["year"] == yr) &
-    (df["month"] == mo)
-].sort_values("date").copy()
+month_rows = month_slice(df, daily_index, yr, mo)
+drill = month_rows[month_rows["emotion"] == emotion].copy()
 
 # Format date to remove timestamp (show only date)
 drill["date"] = drill["date"].dt.date
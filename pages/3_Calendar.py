@@ -4,6 +4,15 @@ import numpy as np
 import calendar
 from datetime import date
 
+from mood_data import (
+    build_partition_index,
+    cache_loader,
+    month_slice,
+    read_daily,
+    sort_by_period,
+    year_slice,
+)
+
 MONTH_NAMES = ["January","February","March","April","May","June","July","August","September","October","November","December"]
 
 st.markdown(
@@ -36,16 +45,16 @@ st.markdown(
 
 
 
-@st.cache_data
+@cache_loader
 def load_all():
-    df = pd.read_csv("data/mood_all_years.csv", parse_dates=["date"])
+    df = sort_by_period(read_daily())
     df["year"] = df["year"].astype(int)
     df["month"] = df["month"].astype(int)
     df["day"] = df["day"].astype(int)
     df["score"] = pd.to_numeric(df["score"], errors="coerce")
-    return df
+    return df, build_partition_index(df)
 
-df = load_all()
+df, daily_index = load_all()
 
 st.title("Calendar")
 
@@ -55,7 +64,7 @@ st.title("Calendar")
 years = sorted(df["year"].unique().tolist())
 year = st.sidebar.selectbox("Year", years, index=len(years) - 1)
 
-months_available = sorted(df[df["year"] == year]["month"].unique().tolist())
+months_available = year_slice(df, daily_index, year)["month"].unique().tolist()
 # default to latest available month in that year
 default_month_idx = len(months_available) - 1
 month = st.sidebar.selectbox(
@@ -71,8 +80,7 @@ emotions = sorted(df["emotion"].dropna().unique().tolist())
 # ----------------------------
 # Build month data
 # ----------------------------
-dfm = df[(df["year"] == year) & (df["month"] == month)].copy()
-dfm = dfm.sort_values("day")
+dfm = month_slice(df, daily_index, year, month)  # date-sorted view
 
 # one row per day (you should already have 1/day)
 day_to_row = {int(r["day"]): r for _, r in dfm.iterrows()}
@@ -0,0 +1,163 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+
+from mood_data import (
+    build_partition_index,
+    cache_loader,
+    dataset_version,
+    period_slice,
+    read_daily,
+    sort_by_period,
+)
+
+MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+WEEKDAYS = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
+EMPTY_RGB = (38, 39, 48)  # days with no entry (matches the dark theme)
+
+st.markdown(
+    """
+    <style>
+    .block-container {
+        max-width: 75vw !important;
+        padding-left: 2.5rem;
+        padding-right: 2.5rem;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True,
+)
+
+@cache_loader
+def load_all(version):
+    df = sort_by_period(read_daily())
+    df["year"] = df["year"].astype(int)
+    df["score"] = pd.to_numeric(df["score"], errors="coerce")
+    return df, build_partition_index(df)
+
+def hex_to_rgb(colors):
+    """Vectorised '#RRGGBB' -> (n, 3) uint8 array; unknown colors become EMPTY_RGB."""
+    uniq, inv = np.unique(np.asarray(colors, dtype=str), return_inverse=True)
+    table = np.array(
+        [
+            [int(h[1:3], 16), int(h[3:5], 16), int(h[5:7], 16)] if len(h) == 7 and h[0] == "#" else EMPTY_RGB
+            for h in uniq
+        ],
+        dtype=np.uint8,
+    ).reshape(-1, 3)
+    return table[inv]
+
+@st.cache_data
+def year_pixels(_df, _index, version, year_min, year_max, layout):
+    """
+    Build one RGB array (+ hover text) for every day in [year_min, year_max].
+
+    "Year rows":  years x 366 — slot 59 (Feb 29) stays empty in non-leap years
+                  so the same calendar day lines up vertically.
+    "Week grid":  7 weekdays x N weeks, weeks running Monday..Sunday.
+    Cached per (dataset version, year range, layout); _df/_index are not hashed.
+    """
+    d = period_slice(_df, _index, (year_min, 1), (year_max, 12))
+    dates = pd.DatetimeIndex(d["date"])
+    rgb = hex_to_rgb(d["color_hex"].astype(str))
+    hover = (
+        dates.strftime("%a %b %d, %Y") + "<br>" + d["emotion"].astype(str).to_numpy()
+        + " · score " + d["score"].map(lambda v: "" if pd.isna(v) else str(int(v))).to_numpy()
+    )
+
+    if layout == "Year rows":
+        rows = dates.year.to_numpy() - year_min
+        doy = dates.dayofyear.to_numpy() - 1
+        cols = doy + ((~dates.is_leap_year) & (dates.month > 2)).astype(int)
+        shape = (year_max - year_min + 1, 366)
+        y_labels = [str(y) for y in range(year_min, year_max + 1)]
+    else:
+        origin = pd.Timestamp(year=year_min, month=1, day=1)
+        origin -= pd.Timedelta(days=origin.weekday())
+        offset = (dates - origin).days.to_numpy()
+        rows, cols = offset % 7, offset // 7
+        end = pd.Timestamp(year=year_max, month=12, day=31)
+        shape = (7, (end - origin).days // 7 + 1)
+        y_labels = WEEKDAYS
+
+    z = np.empty(shape + (3,), dtype=np.uint8)
+    z[:] = EMPTY_RGB
+    text = np.full(shape, "No entry", dtype=object)
+    z[rows, cols] = rgb
+    text[rows, cols] = hover
+    return z, text, y_labels
+
+df, daily_index = load_all(dataset_version())
+
+st.title("Year in Pixels")
+
+years = sorted(df["year"].unique().tolist())
+if not years:
+    st.error("No daily data found in data/mood_all_years.csv")
+    st.stop()
+
+# -----------------------------
+# Sidebar controls
+# -----------------------------
+st.sidebar.subheader("Filters")
+if len(years) > 1:
+    year_min, year_max = st.sidebar.slider(
+        "Year range",
+        min_value=int(min(years)),
+        max_value=int(max(years)),
+        value=(int(min(years)), int(max(years)))
+    )
+else:
+    year_min = year_max = int(years[0])
+
+layout = st.sidebar.radio("Layout", ["Year rows", "Week grid"], index=0)
+
+z, text, y_labels = year_pixels(df, daily_index, dataset_version(), year_min, year_max, layout)
+
+# -----------------------------
+# One image trace for the whole range
+# -----------------------------
+fig = go.Figure(go.Image(
+    z=z,
+    text=text,
+    hovertemplate="%{text}<extra></extra>",
+))
+
+if layout == "Year rows":
+    # Month starts in the 366-slot (leap year) layout
+    month_starts = pd.date_range("2024-01-01", periods=12, freq="MS").dayofyear - 1
+    fig.update_xaxes(tickvals=list(month_starts), ticktext=MONTH_NAMES)
+    height = max(220, 38 * len(y_labels) + 80)
+else:
+    first_monday = pd.Timestamp(year=year_min, month=1, day=1)
+    first_monday -= pd.Timedelta(days=first_monday.weekday())
+    jan_firsts = pd.date_range(f"{year_min}-01-01", f"{year_max}-12-31", freq="YS")
+    fig.update_xaxes(
+        tickvals=[(d - first_monday).days // 7 for d in jan_firsts],
+        ticktext=[str(d.year) for d in jan_firsts],
+    )
+    height = 300
+
+fig.update_yaxes(tickvals=list(range(len(y_labels))), ticktext=y_labels)
+fig.update_layout(height=height, margin=dict(l=10, r=10, t=20, b=10))
+st.plotly_chart(fig, use_container_width=True)
+
+# Legend: one markdown call for all emotions
+legend = (
+    df[["emotion", "score", "color_hex"]]
+    .dropna(subset=["emotion", "color_hex"])
+    .drop_duplicates(subset="emotion")
+    .sort_values("score", ascending=False)
+)
+st.markdown(
+    " ".join(
+        f"<span style='display:inline-block; margin:0 10px 6px 0; white-space:nowrap;'>"
+        f"<span style='display:inline-block; width:12px; height:12px; border-radius:3px; "
+        f"background:{r.color_hex}; vertical-align:middle; margin-right:5px;'></span>{r.emotion}</span>"
+        for r in legend.itertuples()
+    ),
+    unsafe_allow_html=True,
+)
+
+st.caption("Each pixel is one day. Hover for the date, emotion and score.")
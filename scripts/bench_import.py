@@ -0,0 +1,104 @@
+"""
+Benchmark scripts/import_moods.py on synthetic multi-million-row exports.
+
+    python -m scripts.bench_import                       # 1M and 4M rows, CSV + JSON Lines
+    python -m scripts.bench_import --rows 2000000 --formats csv --chunksize 100000
+
+Writes Daylio-style exports (several entries per day over 2000-2025, ~1%
+unmappable labels) to a temp directory, imports each into a scratch store
+in a fresh process, and reports rows/s and the importer's peak RSS. Peak
+RSS should stay roughly flat as rows grow; it tracks --chunksize.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOODS = np.array(["rad", "good", "meh", "bad", "awful", "???"])
+MOOD_P = [0.15, 0.35, 0.3, 0.12, 0.07, 0.01]
+
+# Runs in a fresh interpreter so ru_maxrss is the importer's own peak
+_RUN_SNIPPET = """
+import json, resource, sys, time
+from scripts.import_moods import SOURCES, build_label_map, import_file
+path, out, chunksize = sys.argv[1], sys.argv[2], int(sys.argv[3])
+source = SOURCES["daylio"]
+start = time.perf_counter()
+stats = import_file(path, source, build_label_map(source["labels"]), out, chunksize, date_format="%Y-%m-%d")
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "rows": stats["rows_read"], "days": stats["days_imported"], "seconds": elapsed,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def write_synthetic(path, rows, fmt, seed=0, block=500_000, start="2000-01-01", end="2025-12-31"):
+    """Write a Daylio-style export of `rows` entries dated start..end, block by block."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(start, "D")
+    n_days = int((np.datetime64(end, "D") - start).astype(np.int64)) + 1
+    with open(path, "w", encoding="utf-8") as f:
+        for i, offset in enumerate(range(0, rows, block)):
+            n = min(block, rows - offset)
+            days = start + rng.integers(0, n_days, n).astype("timedelta64[D]")
+            df = pd.DataFrame({
+                "full_date": days.astype(str),
+                "time": pd.Series(rng.integers(0, 24 * 60, n)).map(lambda t: f"{t // 60:02d}:{t % 60:02d}"),
+                "mood": rng.choice(MOODS, n, p=MOOD_P),
+                "activities": "work | friends",
+                "note": "",
+            })
+            if fmt == "csv":
+                df.to_csv(f, index=False, header=(i == 0))
+            else:
+                df.to_json(f, orient="records", lines=True)
+
+
+def run_import(path, chunksize):
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "store.csv")
+        env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        res = subprocess.run(
+            [sys.executable, "-c", _RUN_SNIPPET, path, out, str(chunksize)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="1000000,4000000", help="comma-separated row counts")
+    parser.add_argument("--formats", default="csv,jsonl", help="comma-separated: csv, jsonl")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    args = parser.parse_args()
+
+    sizes = [int(x) for x in args.rows.split(",") if x.strip()]
+    formats = [x.strip() for x in args.formats.split(",") if x.strip()]
+
+    print(f"{'format':<8}{'rows':>12}{'file MB':>10}{'days':>8}{'seconds':>9}{'rows/s':>12}{'peak RSS MB':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            for rows in sizes:
+                path = os.path.join(tmp, f"export_{rows}.{fmt}")
+                t0 = time.perf_counter()
+                write_synthetic(path, rows, fmt)
+                gen = time.perf_counter() - t0
+                r = run_import(path, args.chunksize)
+                print(
+                    f"{fmt:<8}{r['rows']:>12,}{os.path.getsize(path) / 2**20:>10.0f}{r['days']:>8,}"
+                    f"{r['seconds']:>9.1f}{r['rows'] / r['seconds']:>12,.0f}{r['peak_rss_mb']:>13.0f}"
+                    f"   (generated in {gen:.0f}s)"
+                )
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Build the derived tables in data/ from mood_all_years.csv.
+
+    python -m scripts.build_tables            # rebuild only the years whose rows changed
+    python -m scripts.build_tables --force    # rebuild every partition
+    python -m scripts.build_tables --strict   # fail if sheet HI != computed HI
+
+Sources (written by ExtractEmotions.ipynb):
+  - data/mood_all_years.csv        one row per day
+  - data/mood_monthly_hi_sheet.csv HI as reported by each sheet's row 45
+
+Every derived table is declared in DERIVED_TABLES as a per-year function of
+its sources. A hash of each year's input rows, plus a hash of the table's
+build function, is kept in data/.build_state.json; on the next run only
+years whose hash changed are recomputed (all of them if the build function
+was edited) and the other years' rows are carried over from the existing
+output. Verification runs over the whole output table, and --strict fails
+before anything is written. Outputs are written atomically (temp file +
+rename).
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+
+import pandas as pd
+
+from mood_data import build_hi_sketch, sketch_counts
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = os.path.join(ROOT, "data", ".build_state.json")
+
+SOURCES = {
+    "daily": "data/mood_all_years.csv",
+    "sheet_hi": "data/mood_monthly_hi_sheet.csv",
+}
+
+
+# -----------------------------
+# Partition builders
+# -----------------------------
+def build_monthly_hi(year, parts):
+    """
+    Monthly HI for one year: the sheet-reported value where there is one,
+    alongside the HI computed from daily scores (sum of the month's scores).
+    """
+    daily, sheet = parts["daily"], parts["sheet_hi"]
+    computed = (
+        daily.groupby("month", as_index=False)
+        .agg(computed_hi=("score", "sum"), day_sheet=("sheet", "first"))
+    )
+    out = computed.merge(
+        sheet[["month", "happiness_index", "source_sheet"]], on="month", how="outer"
+    )
+    out["year"] = year
+    out["happiness_index"] = out["happiness_index"].fillna(out["computed_hi"])
+    out["source_sheet"] = out["source_sheet"].fillna(out["day_sheet"])
+    out["happiness_index"] = out["happiness_index"].astype(int)
+    out["computed_hi"] = out["computed_hi"].astype("Int64")
+    return out[["year", "month", "happiness_index", "source_sheet", "computed_hi"]]
+
+
+def verify_monthly_hi(rows):
+    """Return the rows where the sheet-reported HI disagrees with the computed HI."""
+    bad = rows[rows["computed_hi"].notna() & (rows["happiness_index"] != rows["computed_hi"])]
+    return bad.assign(diff=bad["happiness_index"] - bad["computed_hi"])
+
+
+def build_year_emotion(year, parts):
+    """Days and total score per emotion for one year, plus % of the year's days."""
+    daily = parts["daily"]
+    out = (
+        daily.groupby("emotion", as_index=False)
+        .agg(days=("date", "count"), total_score=("score", "sum"))
+    )
+    out.insert(0, "year", year)
+    out["total_days"] = int(daily["date"].count())
+    out["pct_days"] = (out["days"] / out["total_days"]) * 100
+    return out
+
+
+def build_year_hi_sketch(year, parts):
+    """
+    HI sketch of one year's months, sparse (one row per HI value). The pages
+    merge the per-year sketches, so a changed year re-sketches only itself.
+    """
+    out = sketch_counts(build_hi_sketch(build_monthly_hi(year, parts)["happiness_index"]))
+    out.insert(0, "year", year)
+    return out
+
+
+DERIVED_TABLES = {
+    "mood_monthly_hi": {
+        "path": "data/mood_monthly_hi.csv",
+        "inputs": ["daily", "sheet_hi"],
+        "build": build_monthly_hi,
+        "verify": verify_monthly_hi,
+        "sort": ["year", "month"],
+    },
+    "mood_hi_sketch": {
+        "path": "data/mood_hi_sketch.csv",
+        "inputs": ["daily", "sheet_hi"],
+        "build": build_year_hi_sketch,
+        "uses": [build_monthly_hi],
+        "sort": ["year", "happiness_index"],
+    },
+    "mood_year_emotion_breakdown": {
+        "path": "data/mood_year_emotion_breakdown.csv",
+        "inputs": ["daily"],
+        "build": build_year_emotion,
+        "sort": ["year", "emotion"],
+    },
+}
+
+
+# -----------------------------
+# Build machinery
+# -----------------------------
+def load_sources():
+    sources = {}
+    for name, rel in SOURCES.items():
+        df = pd.read_csv(os.path.join(ROOT, rel))
+        df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
+        sources[name] = df.dropna(subset=["year"])
+    return sources
+
+
+def partition_hash(frames):
+    """Order-independent content hash of one partition across its inputs."""
+    h = hashlib.sha1()
+    for df in frames:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).sort_values()
+        h.update(",".join(df.columns).encode())
+        h.update(row_hashes.to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def write_atomic(df, path):
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def builder_hash(spec):
+    """
+    Hash of the source of a table's build function and the functions it uses:
+    editing any of them makes every partition dirty.
+    """
+    h = hashlib.sha1()
+    for func in [spec["build"], *spec.get("uses", [])]:
+        h.update(inspect.getsource(func).encode())
+    return h.hexdigest()
+
+
+def build_table(name, spec, sources, state, force=False):
+    """
+    Recompute the partitions of one table whose inputs or build function changed.
+    Writes nothing; returns (rebuilt_years, changed, full output table, state entry).
+    """
+    path = os.path.join(ROOT, spec["path"])
+    inputs = {k: sources[k] for k in spec["inputs"]}
+    years = sorted(set().union(*(df["year"].unique() for df in inputs.values())))
+    parts = {
+        int(y): {k: df[df["year"] == y].drop(columns="year") for k, df in inputs.items()}
+        for y in years
+    }
+    entry = {
+        "builder": builder_hash(spec),
+        "partitions": {str(y): partition_hash(p.values()) for y, p in parts.items()},
+    }
+
+    previous = state.get(name) or {}
+    if force or previous.get("builder") != entry["builder"] or not os.path.exists(path):
+        existing, dirty, removed = None, list(parts), []
+    else:
+        existing = pd.read_csv(path, float_precision="round_trip")
+        old = previous.get("partitions", {})
+        dirty = [y for y in parts if old.get(str(y)) != entry["partitions"][str(y)]]
+        removed = [int(y) for y in old if y not in entry["partitions"]]
+        existing = existing[~existing["year"].isin(dirty + removed)]
+
+    rebuilt = pd.concat([spec["build"](y, parts[y]) for y in dirty], ignore_index=True) if dirty else None
+    out = pd.concat([f for f in (existing, rebuilt) if f is not None], ignore_index=True)
+    out = out.sort_values(spec["sort"]).reset_index(drop=True)
+    return dirty, bool(dirty or removed), out, entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="rebuild every partition")
+    parser.add_argument("--strict", action="store_true", help="exit 1 on verification failures")
+    args = parser.parse_args()
+
+    state = {}
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH) as f:
+            state = json.load(f)
+
+    sources = load_sources()
+    results = {}
+    failed = False
+    for name, spec in DERIVED_TABLES.items():
+        years, changed, out, entry = build_table(name, spec, sources, state, force=args.force)
+        results[name] = (changed, out, entry)
+        print(f"{name}: " + (f"rebuilt {', '.join(map(str, years))}" if years else "up to date"))
+        failures = spec["verify"](out) if "verify" in spec else None
+        if failures is not None and not failures.empty:
+            failed = True
+            print(f"  {len(failures)} row(s) failed verification:")
+            print("  " + failures.to_string(index=False).replace("\n", "\n  "))
+
+    if failed and args.strict:
+        print("Verification failed (--strict): no tables or build state written", file=sys.stderr)
+        sys.exit(1)
+
+    for name, (changed, out, entry) in results.items():
+        if changed:
+            write_atomic(out, os.path.join(ROOT, DERIVED_TABLES[name]["path"]))
+        state[name] = entry
+
+    tmp = f"{STATE_PATH}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Import an external mood-log export into data/mood_all_years.csv.
+
+    python -m scripts.import_moods export.csv --source daylio
+    python -m scripts.import_moods log.jsonl --date-col when --mood-col feeling --map meh=Tired
+    python -m scripts.import_moods big.csv --source generic --on-conflict replace --chunksize 500000
+
+The export is read in chunks (CSV, JSON Lines, or a JSON array parsed
+incrementally), so memory is bounded by the chunk size plus one kept row
+per calendar day, not by the length of the file. Each source mood label is
+mapped onto the EMOTIONS legend (label, score, color); rows whose label
+does not map or whose date does not parse are skipped and reported
+(--strict makes either fatal). Timestamps with a UTC offset count toward
+the local calendar day they were logged on. The first entry seen for a date wins;
+dates already in the store are kept unless --on-conflict replace.
+
+The store is rewritten atomically, date-sorted, in the mood_all_years.csv
+schema. Run `make build` afterwards to refresh the derived tables.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from mood_data import DAILY_COLUMNS, DAILY_CSV, EMOTIONS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SEPARATORS = re.compile(r"[\s,]*")
+
+# Case-insensitive aliases that apply to every source
+COMMON_LABELS = {
+    **{label.lower(): label for label, _, _ in EMOTIONS},
+    "angry": "Angry/Annoyed",
+    "annoyed": "Angry/Annoyed",
+    "stress": "Stress/Anxiety",
+    "stressed": "Stress/Anxiety",
+    "anxiety": "Stress/Anxiety",
+    "anxious": "Stress/Anxiety",
+}
+
+# Known export formats: date column, mood column and their mood scale
+SOURCES = {
+    "generic": {"date": "date", "mood": "mood", "labels": {}},
+    "daylio": {
+        "date": "full_date",
+        "mood": "mood",
+        "labels": {"rad": "Happy", "good": "Good", "meh": "Tired", "bad": "SAD", "awful": "Depressed"},
+    },
+    "bearable": {
+        "date": "date",
+        "mood": "rating",
+        # 1..5 scale
+        "labels": {"5": "Happy", "4": "Good", "3": "Tired", "2": "SAD", "1": "Depressed"},
+    },
+}
+
+
+# -----------------------------
+# Chunked readers
+# -----------------------------
+def iter_json_array(path, chunksize, block=1 << 20):
+    """Yield DataFrames from a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    records = []
+    with open(path, encoding="utf-8") as f:
+        buf = f.read(block).lstrip()
+        if not buf.startswith("["):
+            raise ValueError(f"{path}: expected a JSON array or JSON Lines")
+        pos = 1
+        while True:
+            pos = _SEPARATORS.match(buf, pos).end()
+            if pos == len(buf):
+                buf, pos = f.read(block), 0
+                if not buf:
+                    raise ValueError(f"{path}: unterminated JSON array")
+                continue
+            if buf[pos] == "]":
+                break
+            try:
+                obj, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                data = f.read(block)
+                if not data:
+                    raise
+                buf, pos = buf[pos:] + data, 0
+                continue
+            records.append(obj)
+            if len(records) >= chunksize:
+                yield pd.DataFrame.from_records(records)
+                records = []
+    if records:
+        yield pd.DataFrame.from_records(records)
+
+
+def iter_chunks(path, date_col, mood_col, chunksize):
+    """Yield DataFrames with the date and mood columns of an export, chunk by chunk."""
+    lower = path.lower()
+    if lower.endswith((".jsonl", ".ndjson")):
+        reader = pd.read_json(path, lines=True, chunksize=chunksize, dtype=False)
+    elif lower.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            first = f.read(64).lstrip()[:1]
+        if first == "[":
+            reader = iter_json_array(path, chunksize)
+        else:
+            reader = pd.read_json(path, lines=True, chunksize=chunksize, dtype=False)
+    else:
+        reader = pd.read_csv(path, usecols=[date_col, mood_col], dtype=str, chunksize=chunksize)
+
+    for chunk in reader:
+        if chunk.empty:
+            continue
+        missing = {date_col, mood_col} - set(chunk.columns)
+        if missing:
+            raise KeyError(f"{path}: missing column(s) {sorted(missing)}")
+        yield chunk[[date_col, mood_col]]
+
+
+# -----------------------------
+# Mapping
+# -----------------------------
+def mood_labels(values):
+    """Source mood values as label strings; whole numbers lose any ".0" (4.0 -> "4")."""
+    # Exports use a handful of distinct moods: normalise those, then broadcast back
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    raw = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    num = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce")
+    whole = num.notna() & (num % 1 == 0) & (num.abs() < 2**53)
+    raw[whole] = num[whole].astype(np.int64).astype(str)
+    return pd.Series(raw.to_numpy(dtype=object)[codes], index=values.index)
+
+
+def _local_timestamp(value, date_format):
+    ts = pd.to_datetime(value, errors="coerce", format=date_format)
+    return ts.tz_localize(None) if getattr(ts, "tz", None) is not None else ts
+
+
+def parse_local_dates(values, date_format):
+    """
+    Parse dates to naive wall-clock timestamps (NaT where unparseable).
+    Values with a UTC offset keep their local time, so a late-night entry
+    stays on the day it was logged instead of shifting to the UTC day.
+    """
+    try:
+        dates = pd.to_datetime(values, errors="coerce", format=date_format)
+    except ValueError:
+        # Offsets differ within the chunk (e.g. across a DST change): parse value by value
+        dates = pd.Series(
+            [_local_timestamp(v, date_format) for v in values], index=values.index, dtype="datetime64[ns]",
+        )
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_localize(None)
+    return dates
+
+
+def normalize_chunk(chunk, date_col, mood_col, label_map, date_format, unmapped, bad_dates):
+    """
+    Map one chunk onto the legend.
+    Returns DataFrame(day: int64 days since epoch, emotion) in input order.
+    Skipped rows are counted into unmapped (by label) and bad_dates (by raw date).
+    """
+    raw = mood_labels(chunk[mood_col])
+    emotion = raw.str.lower().map(label_map)
+    dates = parse_local_dates(chunk[date_col], date_format)
+
+    bad_label = emotion.isna()
+    if bad_label.any():
+        unmapped.update(raw[bad_label].value_counts().to_dict())
+
+    bad_date = dates.isna()
+    if bad_date.any():
+        bad_dates.update(chunk[date_col][bad_date].astype(str).value_counts().to_dict())
+
+    keep = ~bad_label & ~bad_date
+    days = dates[keep].to_numpy().astype("datetime64[D]").astype(np.int64)
+    return pd.DataFrame({"day": days, "emotion": emotion[keep].to_numpy()})
+
+
+def to_schema(kept, source_name):
+    """Kept (day, emotion) rows -> mood_all_years.csv schema."""
+    legend = pd.DataFrame(EMOTIONS, columns=["emotion", "score", "color_hex"])
+    out = kept.merge(legend, on="emotion", how="left")
+    out["date"] = pd.to_datetime(out["day"].to_numpy().astype("datetime64[D]"))
+    out["year"] = out["date"].dt.year
+    out["month"] = out["date"].dt.month
+    out["day"] = out["date"].dt.day
+    out["sheet"] = f"import:{source_name}"
+    out["palette_match"] = "IMPORT_LABEL"
+    out["match_dist"] = 0.0
+    return out[DAILY_COLUMNS]
+
+
+def import_file(path, source, label_map, out_path, chunksize, date_format=None,
+                on_conflict="keep", source_name=None, strict=False):
+    """
+    Stream path into the store at out_path. Returns a stats dict.
+    Memory: one chunk + one (day, emotion) row per distinct calendar day.
+    With strict, any row skipped for an unmapped label or unparseable date
+    raises ValueError before the store is touched.
+    """
+    source_name = source_name or os.path.splitext(os.path.basename(path))[0]
+    seen = np.empty(0, dtype=np.int64)   # sorted days already kept
+    kept, unmapped, bad_dates = [], Counter(), Counter()
+    rows = 0
+
+    for chunk in iter_chunks(path, source["date"], source["mood"], chunksize):
+        rows += len(chunk)
+        mapped = normalize_chunk(
+            chunk, source["date"], source["mood"], label_map, date_format, unmapped, bad_dates,
+        )
+        mapped = mapped.drop_duplicates(subset="day", keep="first")
+        mapped = mapped[~np.isin(mapped["day"].to_numpy(), seen, assume_unique=True)]
+        if not mapped.empty:
+            kept.append(mapped)
+            seen = np.union1d(seen, mapped["day"].to_numpy())
+
+    if strict and (unmapped or bad_dates):
+        raise ValueError(
+            f"{path}: {sum(unmapped.values()):,} row(s) with unmapped labels and "
+            f"{sum(bad_dates.values()):,} with unparseable dates; store left unchanged"
+        )
+
+    if not kept:
+        kept = [pd.DataFrame({"day": np.empty(0, dtype=np.int64), "emotion": []})]
+    imported = to_schema(pd.concat(kept, ignore_index=True), source_name)
+
+    if os.path.exists(out_path):
+        existing = pd.read_csv(out_path, parse_dates=["date"], float_precision="round_trip")
+        frames = [existing, imported] if on_conflict == "keep" else [imported, existing]
+        store = pd.concat(frames, ignore_index=True).drop_duplicates(subset="date", keep="first")
+        added = len(store) - len(existing)
+    else:
+        store, added = imported, len(imported)
+
+    store = store.sort_values("date").reset_index(drop=True)
+    tmp = f"{out_path}.tmp"
+    store.to_csv(tmp, index=False, date_format="%Y-%m-%d")
+    os.replace(tmp, out_path)
+
+    return {
+        "rows_read": rows,
+        "days_imported": len(imported),
+        "days_added": added,
+        "store_rows": len(store),
+        "unmapped": unmapped,
+        "bad_dates": bad_dates,
+    }
+
+
+def parse_maps(pairs, map_file):
+    labels = {}
+    if map_file:
+        with open(map_file) as f:
+            labels.update(json.load(f))
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"--map expects LABEL=EMOTION, got {pair!r}")
+        labels[key] = value
+    return labels
+
+
+def build_label_map(source_labels):
+    """Lower-cased source label -> legend label, rejecting targets outside the legend."""
+    legend = {label for label, _, _ in EMOTIONS}
+    label_map = dict(COMMON_LABELS)
+    for key, value in source_labels.items():
+        target = COMMON_LABELS.get(str(value).lower(), value)
+        if target not in legend:
+            raise SystemExit(f"{value!r} is not an emotion in the legend: {sorted(legend)}")
+        label_map[str(key).strip().lower()] = target
+    return label_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV, JSON Lines (.jsonl/.ndjson) or JSON array export")
+    parser.add_argument("--source", choices=sorted(SOURCES), default="generic")
+    parser.add_argument("--date-col", help="override the source's date column")
+    parser.add_argument("--mood-col", help="override the source's mood column")
+    parser.add_argument("--date-format", help="strftime format of the date column (default: infer)")
+    parser.add_argument("--map", action="append", metavar="LABEL=EMOTION", help="extra label mapping")
+    parser.add_argument("--map-file", help="JSON object of extra label mappings")
+    parser.add_argument("--out", default=os.path.join(ROOT, DAILY_CSV), help="store to write into")
+    parser.add_argument("--on-conflict", choices=["keep", "replace"], default="keep",
+                        help="keep existing days in the store, or replace them with imported ones")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--strict", action="store_true",
+                        help="exit 1 without writing if any row has an unmapped label or unparseable date")
+    args = parser.parse_args()
+
+    source = dict(SOURCES[args.source])
+    source["date"] = args.date_col or source["date"]
+    source["mood"] = args.mood_col or source["mood"]
+    label_map = build_label_map({**source["labels"], **parse_maps(args.map, args.map_file)})
+
+    try:
+        stats = import_file(
+            args.path, source, label_map, args.out, args.chunksize,
+            date_format=args.date_format, on_conflict=args.on_conflict, strict=args.strict,
+        )
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(
+        f"Read {stats['rows_read']:,} rows -> {stats['days_imported']:,} days "
+        f"({stats['days_added']:,} new); store now has {stats['store_rows']:,} days"
+    )
+    if stats["unmapped"]:
+        print("Skipped unmapped labels (use --map LABEL=EMOTION):")
+        for label, n in stats["unmapped"].most_common(20):
+            print(f"  {label!r}: {n:,}")
+    if stats["bad_dates"]:
+        print("Skipped rows with unparseable dates (use --date-format):")
+        for value, n in stats["bad_dates"].most_common(20):
+            print(f"  {value!r}: {n:,}")
+    if stats["days_added"]:
+        print("Run `make build` to refresh the derived tables.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+Concurrent-session load test for the dashboard.
+
+    python -m scripts.load_test --sessions 1,10,50,200
+    python -m scripts.load_test --sessions 50 --server-filters
+    python -m scripts.load_test --url ws://127.0.0.1:8501 --server-pid 1234
+
+Starts the app locally (unless --url is given) and, for each concurrency
+level, opens that many sessions over Streamlit's websocket protocol
+(protobuf BackMsg/ForwardMsg, the same messages the browser sends). Every
+session runs the same script a real visitor would:
+
+  land on Overview -> change year -> Monthly Trends -> Heatmap view
+  -> Emotions -> pick two emotions -> drill-down month -> Calendar
+  -> page back three months
+
+Pages filter in the browser by default ("Filter in browser"), so the year
+and emotion steps only exist server-side with --server-filters, which turns
+that toggle off on each page first (one extra rerun per page).
+
+Each step is one script rerun; its latency is the time from sending the
+rerun request to receiving script_finished, and its size the bytes of
+ForwardMsgs received meanwhile. Per level we report reruns/s, p50/p95/p99
+rerun latency, KB per rerun and the server's CPU and RSS (sampled from
+/proc). The explorer's aggregate payload is only in the first rerun of each
+page per session, so the drill-down step shows what a rerun costs after it.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FINISHED_OK = ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY
+FINISHED_COMPILE_ERROR = ForwardMsg.ScriptFinishedStatus.FINISHED_WITH_COMPILE_ERROR
+
+
+# -----------------------------
+# One simulated browser session
+# -----------------------------
+class Session:
+    """A websocket session that tracks pages and widgets like the frontend does."""
+
+    def __init__(self, ws, timeout):
+        self.ws = ws
+        self.timeout = timeout
+        self.pages = {}        # page name -> page_script_hash
+        self.page_hash = ""
+        self.widgets = {}      # label -> (element type, widget id, options)
+        self.states = {}       # widget id -> WidgetState
+        self.errors = 0
+
+    async def rerun(self, page=None):
+        """Request a rerun (optionally of another page); return (latency in seconds, bytes received)."""
+        if page is not None:
+            self.page_hash = self.pages[page]
+            self.states = {}
+
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        self.widgets = {}
+        received = 0
+        while True:
+            raw = await asyncio.wait_for(self.ws.recv(), self.timeout)
+            received += len(raw)
+            fwd = ForwardMsg.FromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = fwd.new_session.page_script_hash
+                self.pages.update({p.page_name: p.page_script_hash for p in fwd.new_session.app_pages})
+                self.widgets = {}
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._track_element(fwd.delta.new_element)
+            elif kind == "script_finished":
+                if fwd.script_finished == FINISHED_OK:
+                    return time.perf_counter() - start, received
+                if fwd.script_finished == FINISHED_COMPILE_ERROR:
+                    self.errors += 1
+                    return time.perf_counter() - start, received
+
+    def _track_element(self, element):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors += 1
+            return
+        proto = getattr(element, kind)
+        if getattr(proto, "id", "") and getattr(proto, "label", ""):
+            self.widgets[proto.label] = (kind, proto.id, list(getattr(proto, "options", [])))
+
+    def options(self, label):
+        return self.widgets[label][2]
+
+    def set_widget(self, label, value):
+        """Set a checkbox/toggle (bool), selectbox/radio (str) or multiselect (list of str) by its label."""
+        _, widget_id, _ = self.widgets[label]
+        state = WidgetState(id=widget_id)
+        if isinstance(value, bool):
+            state.bool_value = value
+        elif isinstance(value, list):
+            state.string_array_value.data.extend(value)
+        else:
+            state.string_value = value
+        self.states[widget_id] = state
+
+
+async def visitor_script(session, think, record, server_filters=False):
+    """The page-by-page walk every simulated visitor performs."""
+
+    async def step(name, coro):
+        record(name, *await coro)
+        await asyncio.sleep(random.uniform(0, 2 * think))
+
+    async def use_server_filters():
+        if server_filters and "Filter in browser" in session.widgets:
+            session.set_widget("Filter in browser", False)
+            await step("server_filters", session.rerun())
+
+    await step("land", session.rerun())
+    await use_server_filters()
+
+    # Widgets missing here are handled in the browser: no rerun to measure
+    if "Year" in session.widgets:
+        years = session.options("Year")
+        session.set_widget("Year", random.choice(years[:-1] or years))
+        await step("change_year", session.rerun())
+
+    await step("open_monthly", session.rerun(page="Monthly Trends"))
+    session.set_widget("View", "Heatmap")
+    await step("heatmap", session.rerun())
+
+    await step("open_emotions", session.rerun(page="Emotions"))
+    await use_server_filters()
+    if "Emotion" in session.widgets:
+        for emotion in random.sample(session.options("Emotion"), 2):
+            session.set_widget("Emotion", emotion)
+            await step("pick_emotion", session.rerun())
+    months = session.options("Month")
+    session.set_widget("Month", random.choice(months))
+    await step("drill_down", session.rerun())
+
+    await step("open_calendar", session.rerun(page="Calendar"))
+    months = session.options("Month")
+    for idx in range(len(months) - 2, max(-1, len(months) - 5), -1):
+        session.set_widget("Month", months[idx])
+        await step("page_calendar", session.rerun())
+
+
+async def run_session(url, think, timeout, record, server_filters=False):
+    async with websockets.connect(
+        f"{url}/_stcore/stream", subprotocols=["streamlit"], max_size=None, open_timeout=timeout
+    ) as ws:
+        session = Session(ws, timeout)
+        await visitor_script(session, think, record, server_filters)
+        return session.errors
+
+
+# -----------------------------
+# Server-side sampling
+# -----------------------------
+def read_proc(pid):
+    """(cpu seconds, rss MB) for pid, or None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return cpu, rss_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+async def sample_server(pid, samples, stop, interval=0.5):
+    prev = read_proc(pid)
+    prev_t = time.perf_counter()
+    while not stop.is_set() and prev is not None:
+        await asyncio.sleep(interval)
+        cur = read_proc(pid)
+        now = time.perf_counter()
+        if cur is None:
+            break
+        samples.append((100 * (cur[0] - prev[0]) / (now - prev_t), cur[1]))
+        prev, prev_t = cur, now
+
+
+async def run_level(url, n, think, timeout, ramp, server_pid, server_filters=False):
+    latencies = []
+
+    def record(step, seconds, nbytes):
+        latencies.append((step, seconds, nbytes))
+
+    async def delayed(i):
+        await asyncio.sleep(ramp * i / max(1, n))
+        return await run_session(url, think, timeout, record, server_filters)
+
+    samples, stop = [], asyncio.Event()
+    sampler = asyncio.create_task(sample_server(server_pid, samples, stop)) if server_pid else None
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(delayed(i) for i in range(n)), return_exceptions=True)
+    wall = time.perf_counter() - start
+
+    stop.set()
+    if sampler:
+        await sampler
+
+    failed = sum(1 for r in results if isinstance(r, BaseException))
+    errors = sum(r for r in results if not isinstance(r, BaseException))
+    lat = np.array([s for _, s, _ in latencies]) * 1000
+    kb = np.array([b for _, _, b in latencies]) / 1024
+    return {
+        "sessions": n,
+        "reruns": len(lat),
+        "failed": failed + errors,
+        "rps": len(lat) / wall if wall else 0.0,
+        "p50": np.percentile(lat, 50) if len(lat) else float("nan"),
+        "p95": np.percentile(lat, 95) if len(lat) else float("nan"),
+        "p99": np.percentile(lat, 99) if len(lat) else float("nan"),
+        "kb": kb.mean() if len(kb) else float("nan"),
+        "cpu_avg": np.mean([c for c, _ in samples]) if samples else float("nan"),
+        "cpu_max": max((c for c, _ in samples), default=float("nan")),
+        "rss_max": max((r for _, r in samples), default=float("nan")),
+        "by_step": {
+            step: (
+                *np.percentile([s * 1000 for name, s, _ in latencies if name == step], [50, 95]),
+                np.mean([b / 1024 for name, _, b in latencies if name == step]),
+            )
+            for step in dict.fromkeys(name for name, _, _ in latencies)
+        },
+    }
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def start_server(port):
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", "app.py",
+        "--server.port", str(port),
+        "--server.headless", "true",
+        "--browser.gatherUsageStats", "false",
+    ]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2):
+                return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError(f"streamlit did not come up on port {port}")
+
+
+def print_report(rows):
+    print(
+        f"{'sessions':>8}{'reruns':>8}{'failed':>8}{'reruns/s':>10}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'KB/rerun':>10}{'CPU avg%':>10}{'CPU max%':>10}{'RSS MB':>9}"
+    )
+    for r in rows:
+        print(
+            f"{r['sessions']:>8}{r['reruns']:>8}{r['failed']:>8}{r['rps']:>10.1f}"
+            f"{r['p50']:>9.0f}{r['p95']:>9.0f}{r['p99']:>9.0f}{r['kb']:>10.1f}"
+            f"{r['cpu_avg']:>10.0f}{r['cpu_max']:>10.0f}{r['rss_max']:>9.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", default="1,10,50", help="comma-separated concurrency levels")
+    parser.add_argument("--url", help="ws://host:port of a running app (default: start one)")
+    parser.add_argument("--port", type=int, default=8765, help="port for the locally started app")
+    parser.add_argument("--server-pid", type=int, help="pid to sample when using --url")
+    parser.add_argument("--think", type=float, default=0.5, help="mean think time between steps (s)")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which sessions connect")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--server-filters", action="store_true",
+                        help="turn off in-browser filtering so year/emotion changes rerun on the server")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    levels = [int(x) for x in args.sessions.split(",") if x.strip()]
+
+    server = None
+    url, server_pid = args.url, args.server_pid
+    if url is None:
+        server = start_server(args.port)
+        url, server_pid = f"ws://127.0.0.1:{args.port}", server.pid
+
+    rows = []
+    try:
+        for n in levels:
+            rows.append(asyncio.run(run_level(
+                url, n, args.think, args.timeout, args.ramp, server_pid, args.server_filters,
+            )))
+            print_report(rows[-1:] if len(rows) > 1 else rows)
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    print("\nSummary")
+    print_report(rows)
+
+    if rows:
+        print(f"\nPer-step latency at {rows[-1]['sessions']} sessions")
+        for step, (p50, p95, kb) in rows[-1]["by_step"].items():
+            print(f"{step:<16}p50 {p50:>7.0f} ms   p95 {p95:>7.0f} ms   {kb:>7.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Run the dashboard as N local Streamlit workers sharing one memory-mapped dataset.
+
+    python -m scripts.serve_workers -n 4            # launch workers on 8501..8504
+    python -m scripts.serve_workers -n 4 --measure  # compare per-worker memory, CSV vs shared
+    python -m scripts.serve_workers -n 4 --measure --synthetic-days 0,30000,120000
+
+The daily rows, monthly HI and prefix-sum aggregates are written once to
+data/mood_shared.bin (rebuilt when the CSVs are newer). Each worker gets
+MOOD_SHARED_DATA pointing at it and maps it read-only instead of parsing
+its own copy of the CSVs.
+
+--measure starts n bare loader processes per mode. With --synthetic-days
+it repeats the comparison on generated histories of that many days (0 =
+the bundled data), so the growth of per-worker anonymous memory with
+history length is visible: flat in shared mode for the data itself, linear
+in CSV mode. The derived columns the page loaders add on top of the data
+(to_numeric copies, month_name, year_month) are reported as a second stage,
+since they stay per-worker in both modes.
+
+Put the workers behind any reverse proxy with sticky sessions (Streamlit
+keeps session state per websocket), e.g. nginx `ip_hash`.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from mood_data import DAILY_CSV, MONTHLY_CSV, is_shared_dataset, write_shared_dataset
+from scripts.bench_import import write_synthetic
+from scripts.import_moods import SOURCES, build_label_map, import_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATA = os.path.join(ROOT, "data", "mood_shared.bin")
+
+# What one worker does on its first page load, minus the UI: first the data
+# itself, then the derived columns the page loaders add (Overview load_data,
+# Emotions load_all), which every worker builds for itself in either mode
+_LOAD_SNIPPET = """
+import sys
+import pandas as pd
+from mood_data import load_prefix, read_daily, read_monthly
+df = read_daily()
+dfm = read_monthly()
+prefix = load_prefix(df)
+# touch every column so mapped pages are actually resident
+for frame in (df, dfm):
+    for c in frame.columns:
+        frame[c].to_numpy().tobytes()
+for k in ("days", "score_sum", "scored"):
+    prefix[k].sum()
+print("data", flush=True)
+sys.stdin.readline()
+
+MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+for c in ["year", "month", "day", "score"]:
+    df[c] = pd.to_numeric(df[c], errors="coerce")
+df["month_name"] = df["month"].astype(int).map(lambda m: MONTH_NAMES[m-1])
+df["year_month"] = pd.to_datetime(df["year"].astype(int).astype(str) + "-" + df["month"].astype(int).astype(str) + "-01")
+print("pages", flush=True)
+sys.stdin.readline()
+"""
+STAGES = ["data", "pages"]
+
+# Oldest start that still fits pandas' nanosecond timestamps
+_SYNTHETIC_END = np.datetime64("2025-12-31")
+_SYNTHETIC_MIN_START = np.datetime64("1678-01-01")
+
+
+def ensure_shared_file(path, rebuild=False):
+    """(Re)write the shared file if missing, stale, or rebuild is set."""
+    sources = [os.path.join(ROOT, DAILY_CSV), os.path.join(ROOT, MONTHLY_CSV)]
+    stale = not is_shared_dataset(path) or os.path.getmtime(path) < max(map(os.path.getmtime, sources))
+    if rebuild or stale:
+        cwd = os.getcwd()
+        os.chdir(ROOT)
+        try:
+            manifest = write_shared_dataset(path)
+        finally:
+            os.chdir(cwd)
+        print(f"Wrote {path} ({os.path.getsize(path):,} bytes, version {manifest['version']})")
+    return path
+
+
+def memory_kb(pid):
+    """Rss / Pss / anonymous / file-backed resident memory (kB) from /proc."""
+    out = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss", "Anonymous", "Shared_Clean", "Private_Clean"):
+                    out[key] = int(rest.split()[0])
+    except OSError:
+        pass
+    return out
+
+
+def print_memory_table(rows):
+    """rows: list of (label, pid)."""
+    print(f"{'worker':<14}{'pid':>8}{'RSS MB':>10}{'PSS MB':>10}{'anon MB':>10}{'shared MB':>11}")
+    for label, pid in rows:
+        m = memory_kb(pid)
+        if not m:
+            print(f"{label:<14}{pid:>8}{'n/a':>10}")
+            continue
+        print(
+            f"{label:<14}{pid:>8}"
+            f"{m.get('Rss', 0) / 1024:>10.1f}{m.get('Pss', 0) / 1024:>10.1f}"
+            f"{m.get('Anonymous', 0) / 1024:>10.1f}{m.get('Shared_Clean', 0) / 1024:>11.1f}"
+        )
+
+
+def wait_healthy(port, proc, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def serve(n, base_port, data_path, report_every):
+    env = dict(os.environ, MOOD_SHARED_DATA=data_path)
+    # Route SIGTERM through the same cleanup as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    procs = []
+    for i in range(n):
+        port = base_port + i
+        cmd = [
+            sys.executable, "-m", "streamlit", "run", "app.py",
+            "--server.port", str(port),
+            "--server.headless", "true",
+        ]
+        procs.append((port, subprocess.Popen(cmd, cwd=ROOT, env=env)))
+
+    try:
+        for port, p in procs:
+            status = "up" if wait_healthy(port, p) else "NOT RESPONDING"
+            print(f"worker :{port} {status}")
+
+        print("\nupstream mood_dashboard {\n    ip_hash;")
+        for port, _ in procs:
+            print(f"    server 127.0.0.1:{port};")
+        print("}\n")
+
+        while all(p.poll() is None for _, p in procs):
+            time.sleep(report_every)
+            print_memory_table([(f":{port}", p.pid) for port, p in procs])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for _, p in procs:
+            p.terminate()
+        for _, p in procs:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+                p.wait()
+
+
+def build_synthetic_history(root, days, seed=0):
+    """
+    Write data/mood_all_years.csv and data/mood_monthly_hi.csv under root
+    covering `days` days up to 2025-12-31: a synthetic Daylio export run
+    through the importer, then summed per month. Returns (daily, monthly).
+    """
+    start = _SYNTHETIC_END - np.timedelta64(days - 1, "D")
+    if start < _SYNTHETIC_MIN_START:
+        raise SystemExit(f"--synthetic-days {days} starts before {_SYNTHETIC_MIN_START}")
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+
+    export = os.path.join(root, "export.csv")
+    # ~3 entries per day, so nearly every day ends up with one
+    write_synthetic(export, 3 * days, "csv", seed=seed, start=str(start), end=str(_SYNTHETIC_END))
+    source = SOURCES["daylio"]
+    import_file(
+        export, source, build_label_map(source["labels"]), os.path.join(root, DAILY_CSV),
+        chunksize=200_000, date_format="%Y-%m-%d", source_name="synthetic",
+    )
+    os.remove(export)
+
+    daily = pd.read_csv(os.path.join(root, DAILY_CSV), parse_dates=["date"])
+    monthly = daily.groupby(["year", "month"], as_index=False).agg(happiness_index=("score", "sum"))
+    monthly["source_sheet"] = "synthetic"
+    monthly["computed_hi"] = monthly["happiness_index"]
+    monthly.to_csv(os.path.join(root, MONTHLY_CSV), index=False)
+    return daily, monthly
+
+
+def measure(n, data_path, cwd=ROOT):
+    """
+    Start n loader processes per mode (all alive at once so shared pages are
+    split in PSS) and report their memory after each stage of _LOAD_SNIPPET.
+    CSV-mode processes read the CSVs under cwd. Returns summary rows.
+    """
+    summary = []
+    for mode in ["csv", "shared"]:
+        env = dict(os.environ)
+        env.pop("MOOD_SHARED_DATA", None)
+        if mode == "shared":
+            env["MOOD_SHARED_DATA"] = data_path
+        env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "-c", _LOAD_SNIPPET],
+                cwd=cwd, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+            )
+            for _ in range(n)
+        ]
+        for stage in STAGES:
+            for p in procs:
+                p.stdout.readline()
+
+            print(f"\n== {mode}, {stage} ({n} workers) ==")
+            print_memory_table([(f"{mode}-{i}", p.pid) for i, p in enumerate(procs)])
+            mem = [memory_kb(p.pid) for p in procs]
+            total_pss = sum(m.get("Pss", 0) for m in mem) / 1024
+            print(f"total PSS: {total_pss:.1f} MB")
+            summary.append({
+                "mode": mode,
+                "stage": stage,
+                "anon": sum(m.get("Anonymous", 0) for m in mem) / 1024 / n,
+                "pss": total_pss,
+            })
+            for p in procs:
+                p.stdin.write("\n")
+                p.stdin.flush()
+
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+    return summary
+
+
+def measure_sizes(n, data_path, sizes):
+    """Run measure() on the bundled data (size 0) and on synthetic histories."""
+    rows = []
+    for days in sizes:
+        if days == 0:
+            label = f"{len(pd.read_csv(os.path.join(ROOT, DAILY_CSV), usecols=['date'])):,} (bundled)"
+            results = measure(n, data_path)
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                daily, monthly = build_synthetic_history(tmp, days)
+                label = f"{len(daily):,} (synthetic)"
+                path = os.path.join(tmp, "mood_shared.bin")
+                write_shared_dataset(path, daily, monthly)
+                results = measure(n, path, cwd=tmp)
+        rows.extend(dict(r, days=label) for r in results)
+
+    print(f"\n{'history days':<22}{'mode':<8}{'stage':<8}{'anon MB/worker':>16}{'total PSS MB':>14}")
+    for r in rows:
+        print(f"{r['days']:<22}{r['mode']:<8}{r['stage']:<8}{r['anon']:>16.1f}{r['pss']:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--base-port", type=int, default=8501)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="shared dataset file")
+    parser.add_argument("--rebuild", action="store_true", help="rewrite the shared file first")
+    parser.add_argument("--report-every", type=float, default=30.0, help="seconds between RSS reports")
+    parser.add_argument("--measure", action="store_true", help="measure per-worker memory and exit")
+    parser.add_argument("--synthetic-days", default="0",
+                        help="with --measure: comma-separated history lengths to generate (0 = bundled data)")
+    args = parser.parse_args()
+
+    data_path = ensure_shared_file(os.path.abspath(args.data), rebuild=args.rebuild)
+    if args.measure:
+        sizes = [int(x) for x in args.synthetic_days.split(",") if x.strip()]
+        measure_sizes(args.workers, data_path, sizes)
+    else:
+        serve(args.workers, args.base_port, data_path, args.report_every)
+
+
+if __name__ == "__main__":
+    main()